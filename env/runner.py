@@ -19,6 +19,7 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Optional, Any
 import json
@@ -27,7 +28,7 @@ import yaml
 from env.sandbox import Sandbox
 from agent.react_agent import ReActAgent
 from grader.grade import Grader
-from grader.rubric_judge import RubricJudge
+from grader.rubric_judge import RubricJudge, prepare_code_context, read_log_tail
 
 
 class EpisodeRunner:
@@ -257,12 +258,17 @@ Your goal is to build a FUNCTIONAL UI that demonstrates the logic, using simulat
             agent_result = self.agent.run(task)
 
             # Step 3: Run Grading
+            # The judge's source discovery/assembly only reads files, so run it
+            # in the background while install/build wait on subprocesses
             self._log("\n[3/4] Running Automated Checks", prefix="📊")
-            grader = Grader(
-                str(self.workspace_dir),
-                grader_log_path=self.grader_log_path
-            )
-            grader_results = grader.run_all_checks()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                context_future = executor.submit(prepare_code_context, str(self.workspace_dir))
+
+                grader = Grader(
+                    str(self.workspace_dir),
+                    grader_log_path=self.grader_log_path
+                )
+                grader_results = grader.run_all_checks()
 
             # Step 4: Run LLM Judge (only if build passed)
             if not grader_results.get("overall_pass", False):
@@ -288,10 +294,8 @@ Your goal is to build a FUNCTIONAL UI that demonstrates the logic, using simulat
                 system_log = ""
                 if self.system_log_path and self.system_log_path.exists():
                     try:
-                        with open(self.system_log_path, 'r', encoding='utf-8') as f:
-                            full_log = f.read()
-                            # Keep only last 3000 characters (to capture build errors)
-                            system_log = full_log[-3000:] if len(full_log) > 3000 else full_log
+                        # Keep only last 3000 characters (to capture build errors)
+                        system_log = read_log_tail(self.system_log_path, 3000)
                     except Exception as e:
                         self._log(f"Warning: Could not read system.log: {e}", prefix="⚠️")
 
@@ -301,11 +305,18 @@ Your goal is to build a FUNCTIONAL UI that demonstrates the logic, using simulat
                 if rubric is None:
                     rubric = self._get_default_rubric()
 
+                try:
+                    prepared_context = context_future.result()
+                except Exception as e:
+                    self._log(f"Warning: Could not pre-assemble code context: {e}", prefix="⚠️")
+                    prepared_context = None
+
                 judge_results = judge.evaluate(
                     workspace_path=str(self.workspace_dir),
                     prompt=task,
                     rubric=rubric,
-                    system_log=system_log
+                    system_log=system_log,
+                    prepared_context=prepared_context
                 )
 
             # Combine all results
@@ -189,7 +189,8 @@ class Sandbox:
         self,
         command: str,
         cwd: Optional[Path] = None,
-        env: Optional[Dict[str, str]] = None
+        env: Optional[Dict[str, str]] = None,
+        log_path: Optional[Path] = None
     ) -> SandboxResult:
         """
         Run a command in the background without waiting for it to complete.
@@ -197,10 +198,15 @@ class Sandbox:
         This is useful for long-running processes like development servers.
         The process will continue running until cleanup() is called.
 
+        Output is written straight to a file rather than a pipe: nobody drains
+        a pipe for a background process, so a chatty server would block once
+        the pipe buffer (~64 KiB) fills up.
+
         Args:
             command: Command to execute
             cwd: Working directory (defaults to workspace_dir)
             env: Environment variables to pass to the command
+            log_path: File to append stdout/stderr to (output is discarded if None)
 
         Returns:
             SandboxResult with process information
@@ -232,16 +238,26 @@ class Sandbox:
             full_env.update(env)
 
         try:
-            # Start process in background using Popen
-            process = subprocess.Popen(
-                command,
-                cwd=str(cwd),
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                env=full_env
-            )
+            # Start process in background using Popen, sending output to the log file
+            if log_path is not None:
+                with open(log_path, 'ab') as log_file:
+                    process = subprocess.Popen(
+                        command,
+                        cwd=str(cwd),
+                        shell=True,
+                        stdout=log_file,
+                        stderr=subprocess.STDOUT,
+                        env=full_env
+                    )
+            else:
+                process = subprocess.Popen(
+                    command,
+                    cwd=str(cwd),
+                    shell=True,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    env=full_env
+                )
 
             # Store process for later cleanup
             self.background_processes.append(process)
@@ -2,15 +2,23 @@
 Tools module providing file operations and command execution via the Sandbox.
 """
 
+import os
+import stat
+from collections import deque
 from pathlib import Path
 from typing import Dict, Optional, Union
 from datetime import datetime
 from env.sandbox import Sandbox
 
+# Dev server output file, relative to the workspace
+SERVER_LOG_NAME = "server.log"
+
 
 class ToolResult:
     """Result of a tool operation."""
 
+    __slots__ = ("success", "data", "error")
+
     def __init__(
         self,
         success: bool,
@@ -30,6 +38,61 @@ class ToolResult:
         }
 
 
+# Reusable read buffers for read_file(), keyed by size class. Files larger than
+# the biggest class get a one-off buffer that is not returned to the pool.
+_READ_BUF_POOL: Dict[int, deque] = {1 << 14: deque(), 1 << 16: deque(), 1 << 20: deque()}
+
+
+def _read_text(file_path: Path) -> str:
+    """Read a UTF-8 text file through a pooled buffer (same result as Path.read_text)."""
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+
+        # Smallest size class with room for the file plus one byte to detect EOF
+        size_class = next((c for c in _READ_BUF_POOL if size < c), None)
+        if size_class is None:
+            pool = None
+            buf = bytearray(size + 1)
+        else:
+            pool = _READ_BUF_POOL[size_class]
+            try:
+                buf = pool.pop()
+            except IndexError:
+                buf = bytearray(size_class)
+
+        try:
+            with memoryview(buf) as view:
+                n = 0
+                while n < len(buf):
+                    read = os.readv(fd, [view[n:]])
+                    if read == 0:
+                        break
+                    n += read
+
+                if n < len(buf):
+                    content = str(view[:n], "utf-8")
+                else:
+                    # A full buffer means the file grew after fstat; read the rest
+                    chunks = [bytes(view[:n])]
+                    while True:
+                        chunk = os.read(fd, 1 << 16)
+                        if not chunk:
+                            break
+                        chunks.append(chunk)
+                    content = b"".join(chunks).decode("utf-8")
+        finally:
+            if pool is not None:
+                pool.append(buf)
+    finally:
+        os.close(fd)
+
+    # Match read_text()'s universal newline handling
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
 class Tools:
     """
     Provides file and command execution tools using a Sandbox.
@@ -57,6 +120,27 @@ class Tools:
         self.system_log_path = system_log_path
         self._step_counter = 0
 
+        # Workspace prefix for the path containment check in _resolve_in_workspace
+        self._ws_str = str(sandbox.workspace_dir)
+        self._ws_prefix = os.path.join(self._ws_str, "")
+
+    def _resolve_in_workspace(self, path: str) -> Optional[Path]:
+        """
+        Resolve a workspace-relative path, or return None if it escapes the workspace.
+
+        Uses a plain string prefix comparison on the resolved path instead of
+        Path.relative_to() + ValueError, since this runs on every tool call.
+        """
+        resolved = os.path.realpath(os.path.join(self._ws_str, path))
+        if resolved != self._ws_str and not resolved.startswith(self._ws_prefix):
+            return None
+        return Path(resolved)
+
+    def _relative(self, path: Path) -> str:
+        """Workspace-relative string for a path already known to be inside the workspace."""
+        rel = str(path)[len(self._ws_prefix):]
+        return rel or "."
+
     def _log_agent(self, tool_name: str, message: str):
         """Log agent action to agent.log."""
         if self.agent_log_path:
@@ -94,13 +178,9 @@ class Tools:
             ToolResult indicating success or failure
         """
         try:
-            # Resolve path within workspace
-            file_path = (self.sandbox.workspace_dir / path).resolve()
-
-            # Security check: ensure path is within workspace
-            try:
-                file_path.relative_to(self.sandbox.workspace_dir)
-            except ValueError:
+            # Resolve path within workspace (None if it escapes the workspace)
+            file_path = self._resolve_in_workspace(path)
+            if file_path is None:
                 return ToolResult(
                     success=False,
                     error=f"Path must be within workspace: {path}"
@@ -113,7 +193,7 @@ class Tools:
             file_path.write_text(content, encoding="utf-8")
 
             # Log action
-            rel_path = str(file_path.relative_to(self.sandbox.workspace_dir))
+            rel_path = self._relative(file_path)
             self._log_agent("write_file", f"Created/modified {rel_path} ({len(content)} bytes)")
 
             return ToolResult(
@@ -144,13 +224,9 @@ class Tools:
             ToolResult with file content or error
         """
         try:
-            # Resolve path within workspace
-            file_path = (self.sandbox.workspace_dir / path).resolve()
-
-            # Security check: ensure path is within workspace
-            try:
-                file_path.relative_to(self.sandbox.workspace_dir)
-            except ValueError:
+            # Resolve path within workspace (None if it escapes the workspace)
+            file_path = self._resolve_in_workspace(path)
+            if file_path is None:
                 return ToolResult(
                     success=False,
                     error=f"Path must be within workspace: {path}"
@@ -171,10 +247,10 @@ class Tools:
                 )
 
             # Read file content
-            content = file_path.read_text(encoding="utf-8")
+            content = _read_text(file_path)
 
             # Log action
-            rel_path = str(file_path.relative_to(self.sandbox.workspace_dir))
+            rel_path = self._relative(file_path)
             self._log_agent("read_file", f"Read {rel_path} ({len(content)} bytes)")
 
             return ToolResult(
@@ -200,6 +276,76 @@ class Tools:
                 error=f"Error reading file {path}: {str(e)}"
             )
 
+    def send_file(self, path: str, out_fd: int) -> ToolResult:
+        """
+        Copy a file within the sandbox workspace directly to a file descriptor.
+
+        Unlike read_file, the content is never decoded into a Python string:
+        os.sendfile copies it in-kernel, which is cheaper for large files that
+        are only being forwarded to another process.
+
+        Args:
+            path: Relative path to the file (relative to workspace)
+            out_fd: Open, writable file descriptor to copy the content to
+
+        Returns:
+            ToolResult with the number of bytes sent or error
+        """
+        try:
+            # Resolve path within workspace (None if it escapes the workspace)
+            file_path = self._resolve_in_workspace(path)
+            if file_path is None:
+                return ToolResult(
+                    success=False,
+                    error=f"Path must be within workspace: {path}"
+                )
+
+            # Check if path is an existing file
+            if not file_path.is_file():
+                return ToolResult(
+                    success=False,
+                    error=f"File not found: {path}"
+                )
+
+            in_fd = os.open(file_path, os.O_RDONLY)
+            try:
+                size = os.fstat(in_fd).st_size
+                offset = 0
+                while offset < size:
+                    try:
+                        sent = os.sendfile(out_fd, in_fd, offset, min(size - offset, 1 << 20))
+                    except OSError:
+                        # Some platforms only sendfile() to sockets; fall back to read/write
+                        os.lseek(in_fd, offset, os.SEEK_SET)
+                        chunk = os.read(in_fd, min(size - offset, 1 << 20))
+                        sent = os.write(out_fd, chunk) if chunk else 0
+                    if sent == 0:
+                        break
+                    offset += sent
+            finally:
+                os.close(in_fd)
+
+            # Log action
+            rel_path = self._relative(file_path)
+            self._log_agent("send_file", f"Sent {rel_path} ({offset} bytes)")
+
+            return ToolResult(
+                success=True,
+                data={"path": rel_path, "bytes_sent": offset}
+            )
+
+        except PermissionError as e:
+            return ToolResult(
+                success=False,
+                error=f"Permission denied reading {path}: {e}"
+            )
+
+        except Exception as e:
+            return ToolResult(
+                success=False,
+                error=f"Error sending file {path}: {str(e)}"
+            )
+
     def run_command(
         self,
         command: str,
@@ -221,12 +367,10 @@ class Tools:
             # Resolve cwd if provided
             working_dir = None
             if cwd:
-                working_dir = (self.sandbox.workspace_dir / cwd).resolve()
+                working_dir = self._resolve_in_workspace(cwd)
 
                 # Security check: ensure cwd is within workspace
-                try:
-                    working_dir.relative_to(self.sandbox.workspace_dir)
-                except ValueError:
+                if working_dir is None:
                     return ToolResult(
                         success=False,
                         error=f"Working directory must be within workspace: {cwd}"
@@ -295,13 +439,9 @@ class Tools:
             ToolResult with list of files/directories or error
         """
         try:
-            # Resolve path within workspace
-            dir_path = (self.sandbox.workspace_dir / path).resolve()
-
-            # Security check: ensure path is within workspace
-            try:
-                dir_path.relative_to(self.sandbox.workspace_dir)
-            except ValueError:
+            # Resolve path within workspace (None if it escapes the workspace)
+            dir_path = self._resolve_in_workspace(path)
+            if dir_path is None:
                 return ToolResult(
                     success=False,
                     error=f"Path must be within workspace: {path}"
@@ -324,19 +464,24 @@ class Tools:
             # List files using glob pattern
             files = []
             for item in sorted(dir_path.glob(pattern)):
-                relative_path = item.relative_to(self.sandbox.workspace_dir)
+                # One stat() per entry instead of separate is_file/is_dir/stat calls
+                try:
+                    st = item.stat()
+                except OSError:
+                    st = None  # e.g. broken symlink
+                is_file = st is not None and stat.S_ISREG(st.st_mode)
                 files.append({
                     "name": item.name,
-                    "path": str(relative_path),
-                    "is_file": item.is_file(),
-                    "is_dir": item.is_dir(),
-                    "size": item.stat().st_size if item.is_file() else None
+                    "path": self._relative(item),
+                    "is_file": is_file,
+                    "is_dir": st is not None and stat.S_ISDIR(st.st_mode),
+                    "size": st.st_size if is_file else None
                 })
 
             return ToolResult(
                 success=True,
                 data={
-                    "path": str(dir_path.relative_to(self.sandbox.workspace_dir)) if path != "." else ".",
+                    "path": self._relative(dir_path) if path != "." else ".",
                     "files": files,
                     "count": len(files)
                 }
@@ -392,9 +537,10 @@ class Tools:
 
             # 1. CLEANUP
             # Clear old artifacts to ensure fresh resolution
+            ws = self.sandbox.workspace_dir
             items_to_delete = ["pnpm-lock.yaml", "package-lock.json", "node_modules"]
             for item in items_to_delete:
-                item_path = self.sandbox.workspace_dir / item
+                item_path = ws / item
                 if item_path.exists():
                     try:
                         if item_path.is_dir():
@@ -476,7 +622,8 @@ class Tools:
         Start the development server in the background.
 
         This starts 'pnpm dev' without blocking. The server will continue
-        running until the sandbox is cleaned up.
+        running until the sandbox is cleaned up. Server output is written to
+        server.log in the workspace, which can be inspected with read_file.
 
         Args:
             port: Port to run the server on (default: 3000)
@@ -488,8 +635,9 @@ class Tools:
             # Log agent action
             self._log_agent("start_server", f"Starting development server on port {port}")
 
-            # Start server in background
-            result = self.sandbox.run_background("pnpm dev")
+            # Start server in background, logging its output to the workspace
+            log_path = self.sandbox.workspace_dir / SERVER_LOG_NAME
+            result = self.sandbox.run_background("pnpm dev", log_path=log_path)
 
             if result.success:
                 return ToolResult(
@@ -497,7 +645,8 @@ class Tools:
                     data={
                         "url": f"http://localhost:{port}",
                         "message": f"Development server started in background. Access at http://localhost:{port}",
-                        "pid": result.stdout
+                        "pid": result.stdout,
+                        "log_path": SERVER_LOG_NAME
                     }
                 )
             else:
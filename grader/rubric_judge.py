@@ -5,20 +5,321 @@ This module provides subjective evaluation of code quality, UX polish,
 product fit, and edge cases using an LLM as a judge.
 """
 
+import asyncio
+import hashlib
+import io
 import os
 import json
 import re
-import time
 import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
-import litellm
+from typing import Dict, List, Optional, Tuple
+
+try:
+    # orjson parses and serializes several times faster than json; its
+    # JSONDecodeError subclasses json.JSONDecodeError, so callers can catch either
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
 
-# Load environment variables from configs/env.yaml
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from configs.load_env import load_env
-load_env()
+
+# Numbered rubric item line, e.g. "1. Text" or "1) Text"; captures the item
+# without surrounding whitespace
+_RUBRIC_ITEM_RE = re.compile(r'^[^\S\n]*(\d+[.)][^\n]*\S)', re.MULTILINE)
+
+# JSON object inside a markdown code block, and the outermost JSON object
+# anywhere in an LLM response
+_JSON_FENCE_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Source discovery rules: files with these extensions are judged, except
+# config files and anything under build/dependency directories
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.css')
+IGNORE_DIRS = frozenset({'node_modules', '.next', '.git', 'dist', 'build', 'out'})
+IGNORE_FILES = frozenset({
+    'package.json', 'package-lock.json', 'pnpm-lock.yaml',
+    'tsconfig.json', 'next.config.js', 'next.config.ts',
+    'tailwind.config.js', 'tailwind.config.ts',
+    'postcss.config.js', 'postcss.config.mjs',
+    'eslint.config.js', 'eslint.config.mjs',
+})
+
+# Directories holding the code the agent wrote; kept first when the context is truncated
+PRIORITY_DIRS = ("app/", "components/", "pages/", "src/")
+
+# Length of the system.log excerpt that goes into each judge prompt
+SYSTEM_LOG_PROMPT_CHARS = 5000
+
+# Output budget for one item's verdict - a short JSON object
+ITEM_RESPONSE_MAX_TOKENS = 400
+
+# Directory listings younger than this aren't cached (mtime granularity)
+DIR_CACHE_MIN_AGE_NS = 2_000_000_000
+
+# Fewer source files than this are read inline instead of in a thread pool
+READ_POOL_MIN_FILES = 4
+
+# Workspaces with less source code than this fail every item without an LLM call
+MIN_SOURCE_BYTES = 200
+
+# Upper bound on source file contents kept in memory between evaluations
+FILE_CACHE_MAX_CHARS = 32 * 1024 * 1024
+
+# Default (requests, tokens) per minute by LiteLLM provider prefix; models
+# without an entry are not throttled client-side
+PROVIDER_RATE_LIMITS = {
+    "gemini/": (2000, 4_000_000),
+}
+
+# Providers that need explicit cache_control breakpoints for prompt caching
+PROMPT_CACHE_CONTROL_PREFIXES = ("anthropic/",)
+
+# Input context windows of known judge models; the whole rubric is judged
+# in one call when it fits (less CONTEXT_SAFETY_TOKENS)
+MODEL_CONTEXT_TOKENS = {
+    "gemini/gemini-2.0-flash-001": 1_048_576,
+    "gemini/gemini-2.0-flash": 1_048_576,
+    "gemini/gemini-2.5-flash": 1_048_576,
+    "gemini/gemini-2.5-pro": 1_048_576,
+    "openai/gpt-4o": 128_000,
+    "openai/gpt-4o-mini": 128_000,
+    "anthropic/claude-3-5-sonnet-20241022": 200_000,
+}
+CONTEXT_SAFETY_TOKENS = 8_000
+
+# Most models cap a single response around 8K output tokens
+COMBINED_RESPONSE_MAX_TOKENS = 8_000
+
+# Technologies a rubric item may require, with the strings their use leaves
+# in source code. With prefail_technologies, an item saying it "uses" one
+# whose strings never appear is failed without an LLM call.
+TECHNOLOGY_KEYWORDS = {
+    "supabase": ("supabase",),
+    "prisma": ("prisma",),
+    "postgres": ("postgres", "pg"),
+    "postgresql": ("postgres", "pg"),
+    "mongodb": ("mongo",),
+    "firebase": ("firebase",),
+    "stripe": ("stripe",),
+    "nextauth": ("next-auth", "nextauth", "authjs", "auth.js"),
+    "clerk": ("clerk",),
+    "zod": ("zod",),
+    "websocket": ("websocket", "socket.io"),
+    "websockets": ("websocket", "socket.io"),
+}
+_TECHNOLOGY_RE = re.compile(
+    r'\b(?:uses?|using|built (?:with|on))\s+(?:an?\s+|the\s+)?('
+    + '|'.join(re.escape(name) for name in TECHNOLOGY_KEYWORDS) + r')\b',
+    re.IGNORECASE
+)
+# Wording right before "uses <technology>" that makes it forbidden or an example
+_TECHNOLOGY_NEGATION_RE = re.compile(
+    r"(?:\bnot|n't|\bnever|\bwithout|\be\.g\.,?|\bsuch as|\blike|\bfor example,?)\s*$",
+    re.IGNORECASE
+)
+# Wording later in the same clause that makes the technology optional
+_TECHNOLOGY_ALTERNATIVE_RE = re.compile(
+    r'\b(?:or|mock\w*|stub\w*|fake\w*|optional\w*|equivalent|alternatives?)\b',
+    re.IGNORECASE
+)
+
+# Providers whose batch API (JSONL upload, poll, download) LiteLLM can drive
+BATCH_API_PROVIDERS = frozenset({"openai"})
+BATCH_POLL_INTERVAL = 10
+BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+# On-disk cache of evaluate() results for unchanged workspaces
+RUBRIC_CACHE_DIR = Path.home() / ".cache" / "rl-env" / "rubric"
+
+# Part of every cache key; bump when the judge prompts or response parsing
+# change so verdicts from the old judge aren't reused
+RUBRIC_CACHE_VERSION = 2
+
+_token_encoding = None
+
+
+_litellm = None
+
+
+def _load_litellm():
+    """
+    Import litellm and load API keys from configs/env.yaml on first use.
+
+    litellm takes most of a second to import, so this is deferred until a
+    RubricJudge is created rather than paid by every importer of grader.
+    """
+    global _litellm
+    if _litellm is None:
+        import litellm
+        from configs.load_env import load_env
+        load_env()
+        _litellm = litellm
+    return _litellm
+
+
+def _normalize_verdict(result, rubric_item: str) -> Dict:
+    """
+    Validate one parsed LLM verdict and fill in its defaults.
+
+    Args:
+        result: Parsed JSON verdict for one rubric item
+        rubric_item: Rubric requirement the verdict is about
+
+    Returns:
+        The verdict, with "item" set and "evidence" coerced to a string
+
+    Raises:
+        ValueError: If the verdict is not an object with "status" and "evidence"
+    """
+    if not isinstance(result, dict) or "status" not in result or "evidence" not in result:
+        raise ValueError("LLM response missing 'status' or 'evidence'")
+
+    # Ensure the item field is present
+    result.setdefault("item", rubric_item)
+
+    # "error" marks results of failed calls (see _aevaluate_single_item)
+    result.pop("error", None)
+
+    # Models sometimes answer "evidence": null
+    if not isinstance(result["evidence"], str):
+        result["evidence"] = str(result["evidence"] or "")
+
+    return result
+
+
+def _count_tokens(text: str) -> int:
+    """
+    Count tokens with tiktoken's cl100k_base encoding.
+
+    Falls back to a ~4 characters per token estimate if tiktoken is not
+    installed or its encoding can't be loaded.
+    """
+    global _token_encoding
+    if _token_encoding is None:
+        try:
+            import tiktoken
+            _token_encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _token_encoding = False
+    if _token_encoding:
+        return len(_token_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def read_log_tail(log_path: Path, max_chars: int) -> str:
+    """
+    Read the last max_chars characters of a log file.
+
+    Only the end of the file is read, so large build logs are never loaded
+    whole. Invalid UTF-8 (e.g. a character cut at the seek point) is replaced.
+
+    Args:
+        log_path: Path to the log file
+        max_chars: Number of trailing characters to return
+
+    Returns:
+        Tail of the log
+
+    Raises:
+        OSError: If the file can't be opened or read
+    """
+    with open(log_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        # A UTF-8 character is at most 4 bytes
+        f.seek(max(0, size - max_chars * 4))
+        tail = f.read().decode('utf-8', errors='replace')
+
+    return tail[-max_chars:]
+
+
+class _RateLimiter:
+    """
+    Token buckets over requests and tokens per minute for judge completions.
+
+    Holds no asyncio primitives, so one limiter can be shared by the event
+    loops of successive evaluate() calls. Checking and debiting the buckets
+    never awaits, which keeps them consistent between concurrent tasks.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int], tokens_per_minute: Optional[int]):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed_minutes = (now - self._updated) / 60
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(
+                self.requests_per_minute,
+                self._requests + elapsed_minutes * self.requests_per_minute
+            )
+        if self.tokens_per_minute:
+            self._tokens = min(
+                self.tokens_per_minute,
+                self._tokens + elapsed_minutes * self.tokens_per_minute
+            )
+
+    async def acquire(self, tokens: int) -> int:
+        """
+        Wait until one request of roughly `tokens` tokens fits both budgets.
+
+        Args:
+            tokens: Estimated prompt plus completion tokens for the request
+
+        Returns:
+            Number of tokens debited, to pass to settle() once usage is known
+        """
+        if self.tokens_per_minute:
+            # A single oversized request must still go through eventually
+            tokens = min(tokens, self.tokens_per_minute)
+
+        while True:
+            self._refill()
+            wait_minutes = 0.0
+            if self.requests_per_minute and self._requests < 1:
+                wait_minutes = (1 - self._requests) / self.requests_per_minute
+            if self.tokens_per_minute and self._tokens < tokens:
+                wait_minutes = max(wait_minutes, (tokens - self._tokens) / self.tokens_per_minute)
+
+            if wait_minutes <= 0:
+                if self.requests_per_minute:
+                    self._requests -= 1
+                if self.tokens_per_minute:
+                    self._tokens -= tokens
+                return tokens
+
+            await asyncio.sleep(wait_minutes * 60)
+
+    def settle(self, debited_tokens: int, response) -> None:
+        """
+        Replace a request's estimated token cost with its reported usage.
+
+        Args:
+            debited_tokens: Value returned by acquire() for the request
+            response: LiteLLM response; ignored if it doesn't report usage
+        """
+        used_tokens = getattr(getattr(response, "usage", None), "total_tokens", None)
+        if not self.tokens_per_minute or not isinstance(used_tokens, int):
+            return
+
+        self._refill()
+        self._tokens = min(self.tokens_per_minute, self._tokens + debited_tokens - used_tokens)
 
 
 class RubricJudge:
@@ -29,7 +330,21 @@ class RubricJudge:
     based on a provided rubric.
     """
 
-    def __init__(self, model: str = "gemini/gemini-2.0-flash-001", batch_size: int = 5, step_delay: float = 0.0):
+    def __init__(
+        self,
+        model: str = "gemini/gemini-2.0-flash-001",
+        batch_size: int = 5,
+        step_delay: float = 0.0,
+        max_context_tokens: Optional[int] = 100_000,
+        cache_dir: Optional[Path] = RUBRIC_CACHE_DIR,
+        max_concurrency: int = 4,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        use_batch_api: bool = False,
+        combine_items: bool = True,
+        prefail_technologies: bool = False,
+        verbose: bool = False
+    ):
         """
         Initialize the rubric judge.
 
@@ -39,10 +354,116 @@ class RubricJudge:
             step_delay: Delay in seconds between batch evaluations.
                        Individual items within a batch are delayed by ceiling(step_delay/3) seconds.
                        (default: 0.0)
+            max_context_tokens: Token budget for the assembled source code. Files
+                       beyond the budget are left out of the prompt. None disables
+                       the limit. (default: 100,000)
+            cache_dir: Directory for cached evaluation results, keyed by a hash of
+                       the judge settings, prompt, rubric, code and logs. None disables
+                       caching. (default: ~/.cache/rl-env/rubric)
+            max_concurrency: Maximum number of batches evaluated at the same time;
+                       the items of a batch are requested concurrently, so up to
+                       max_concurrency * batch_size calls can be in flight. Batches
+                       and items run one after another when step_delay is set.
+                       (default: 4)
+            requests_per_minute: Client-side cap on judge requests per minute.
+                       (default: from PROVIDER_RATE_LIMITS for the model's provider,
+                       unlimited if it has no entry)
+            tokens_per_minute: Client-side cap on estimated prompt + completion
+                       tokens per minute. (default: as for requests_per_minute)
+            use_batch_api: Submit all rubric items as one provider batch job
+                       (cheaper, but may take minutes to hours). Only used for
+                       providers in BATCH_API_PROVIDERS; falls back to direct
+                       calls otherwise or if the job fails. (default: False)
+            combine_items: Judge the whole rubric in one call when it fits the
+                       model's context window (see MODEL_CONTEXT_TOKENS), instead
+                       of one call per item. (default: True)
+            prefail_technologies: Fail items phrased as "uses <technology>"
+                       without an LLM call when the code never references it
+                       (see TECHNOLOGY_KEYWORDS). (default: False)
+            verbose: Print a progress line per batch; otherwise only the
+                       evaluation's start and summary lines are printed.
+                       (default: False)
         """
         self.model = model
         self.batch_size = batch_size
         self.step_delay = step_delay
+        self.max_context_tokens = max_context_tokens
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.use_batch_api = use_batch_api
+        self.combine_items = combine_items
+        self.prefail_technologies = prefail_technologies
+        self.verbose = verbose
+
+        # Stay under the provider's rate limits rather than tripping 429s and
+        # waiting out LiteLLM's retry backoff
+        default_rpm, default_tpm = next(
+            (limits for prefix, limits in PROVIDER_RATE_LIMITS.items() if model.startswith(prefix)),
+            (None, None)
+        )
+        self._rate_limiter = _RateLimiter(
+            requests_per_minute if requests_per_minute is not None else default_rpm,
+            tokens_per_minute if tokens_per_minute is not None else default_tpm
+        )
+
+        # Source discovery results per directory: path -> (mtime_ns, files, subdirs)
+        self._dir_listing_cache: Dict[str, Tuple[int, Tuple[Path, ...], Tuple[str, ...]]] = {}
+
+        # LRU of source file contents keyed by (path, mtime_ns, size), shared
+        # by the reader threads in _assemble_code_context
+        self._file_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._file_cache_chars = 0
+        self._file_cache_lock = threading.Lock()
+
+        # LiteLLM module, imported by _setup_llm() on first evaluation
+        self._litellm = None
+
+        # Anthropic only caches prompt prefixes marked with cache_control;
+        # OpenAI and Gemini cache repeated prefixes automatically
+        self._explicit_prompt_caching = model.startswith(PROMPT_CACHE_CONTROL_PREFIXES)
+
+        # (code_context, system_log, message) of the last item system message
+        self._item_system_message: Optional[Tuple[str, str, Dict]] = None
+
+    def _setup_llm(self) -> None:
+        """
+        Import LiteLLM and settle the completion parameters on first use.
+
+        Deferred from __init__ so creating a judge, or calling
+        prepare_code_context(), never imports litellm or loads API keys.
+        """
+        if self._litellm is not None:
+            return
+
+        litellm = _load_litellm()
+
+        # Greedy, seeded sampling: verdicts should be reproducible, and some
+        # providers only reuse cached prefixes for identical sampling params.
+        # top_p, seed and JSON mode are only sent where the provider supports them.
+        try:
+            supported_params = litellm.get_supported_openai_params(model=self.model) or []
+        except Exception:
+            supported_params = []
+        self._completion_kwargs = {"temperature": 0.0}
+        if "top_p" in supported_params:
+            self._completion_kwargs["top_p"] = 1.0
+        if "seed" in supported_params:
+            self._completion_kwargs["seed"] = 0
+        if "response_format" in supported_params:
+            self._completion_kwargs["response_format"] = {"type": "json_object"}
+
+        # Judge settings that change verdicts, hashed into every cache key.
+        # Serialized with the stdlib so keys match whether or not orjson is installed.
+        self._cache_settings = json.dumps({
+            "version": RUBRIC_CACHE_VERSION,
+            "model": self.model,
+            "sampling": self._completion_kwargs,
+            "combine_items": self.combine_items,
+            "prefail_technologies": self.prefail_technologies,
+            "technology_keywords": TECHNOLOGY_KEYWORDS,
+        }, sort_keys=True, separators=(",", ":"))
+
+        self._litellm = litellm
 
     def _discover_source_files(self, workspace_path: Path) -> List[Path]:
         """
@@ -64,39 +485,81 @@ class RubricJudge:
         Returns:
             List of source file paths
         """
-        source_extensions = {'.ts', '.tsx', '.js', '.jsx', '.css'}
-        ignore_dirs = {'node_modules', '.next', '.git', 'dist', 'build', 'out'}
-        ignore_files = {
-            'package.json', 'package-lock.json', 'pnpm-lock.yaml',
-            'tsconfig.json', 'next.config.js', 'next.config.ts',
-            'tailwind.config.js', 'tailwind.config.ts',
-            'postcss.config.js', 'postcss.config.mjs',
-            'eslint.config.js', 'eslint.config.mjs',
-            '.gitignore', '.eslintrc', '.prettierrc'
-        }
-
         source_files = []
 
-        for root, dirs, files in os.walk(workspace_path):
-            # Filter out ignored directories in-place
-            dirs[:] = [d for d in dirs if d not in ignore_dirs]
+        # Explicit stack of directories. Each listing is cached against the
+        # directory's mtime, which changes whenever an entry is added, removed
+        # or renamed in it, so re-walking an unchanged tree costs one stat()
+        # per directory
+        stack = [str(workspace_path)]
+        while stack:
+            dir_path = stack.pop()
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+
+            cached = self._dir_listing_cache.get(dir_path)
+            if cached is not None and cached[0] == mtime_ns:
+                _, dir_files, subdirs = cached
+            else:
+                dir_files, subdirs = self._scan_source_dir(dir_path)
+                # A directory modified within the mtime granularity could
+                # change again without its mtime moving; rescan it next time
+                if time.time_ns() - mtime_ns > DIR_CACHE_MIN_AGE_NS:
+                    self._dir_listing_cache[dir_path] = (mtime_ns, dir_files, subdirs)
+
+            source_files.extend(dir_files)
+            stack.extend(subdirs)
+
+        return source_files
+
+    def _scan_source_dir(self, dir_path: str) -> Tuple[Tuple[Path, ...], Tuple[str, ...]]:
+        """
+        List the source files and subdirectories to descend into in one directory.
+
+        Args:
+            dir_path: Directory to scan
+
+        Returns:
+            Tuple of (source file paths, subdirectory paths)
+        """
+        dir_files = []
+        subdirs = []
+
+        # os.scandir's DirEntry caches the file type from the directory read,
+        # so no extra stat() calls are needed per entry
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                name = entry.name
+
+                # Descend into directories unless ignored (symlinks are not followed)
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in IGNORE_DIRS:
+                        subdirs.append(entry.path)
+                    continue
 
-            for file in files:
-                # Check extension
-                if Path(file).suffix not in source_extensions:
+                # Filter on the name first, so non-source entries never need an
+                # is_file() check (which may stat on some filesystems).
+                # Check extension in one C-level call (a bare ".ts" has no suffix)
+                if not name.endswith(SOURCE_EXTENSIONS) or name in SOURCE_EXTENSIONS:
                     continue
 
                 # Check if it's an ignored config file
-                if file in ignore_files:
+                if name in IGNORE_FILES:
+                    continue
+
+                if not entry.is_file():
                     continue
 
                 # Add the file
-                file_path = Path(root) / file
-                source_files.append(file_path)
+                dir_files.append(Path(entry.path))
 
-        return source_files
+        return tuple(dir_files), tuple(subdirs)
 
-    def _assemble_code_context(self, workspace_path: Path, source_files: List[Path]) -> str:
+    def _assemble_code_context(
+        self,
+        workspace_path: Path,
+        source_files: List[Path],
+        max_tokens: Optional[int] = None
+    ) -> Tuple[str, int]:
         """
         Assemble source code files into a single context string.
 
@@ -109,28 +572,154 @@ class RubricJudge:
         <file contents>
         ```
 
+        If max_tokens is set and the files don't fit, files are picked greedily
+        (app/, components/, pages/ and src/ first) until the budget is spent,
+        and a note listing how much was left out is appended. A file whose
+        contents match an earlier file is written as "[identical to <path>]".
+
         Args:
             workspace_path: Base workspace path
             source_files: List of source file paths
+            max_tokens: Token budget for the context (optional, no limit if None)
 
         Returns:
-            Concatenated code context string
+            Tuple of (concatenated code context string, number of files left
+            out to fit max_tokens)
+        """
+        def read_source(file_path: Path) -> str:
+            try:
+                st = os.stat(file_path)
+                key = (str(file_path), st.st_mtime_ns, st.st_size)
+                with self._file_cache_lock:
+                    content = self._file_cache.get(key)
+                    if content is not None:
+                        self._file_cache.move_to_end(key)
+                        return content
+
+                content = file_path.read_text(encoding='utf-8')
+            except Exception as e:
+                return f"[Error reading file: {e}]"
+
+            self._cache_file_content(key, content)
+            return content
+
+        # Get relative paths for cleaner display by slicing off the workspace
+        # prefix, and sort on them component by component - the same order as
+        # sorting the Paths, without comparing Path objects
+        workspace_prefix = os.path.join(str(workspace_path), "")
+        rel_files = []
+        for file_path in source_files:
+            path_str = os.fspath(file_path)
+            if path_str.startswith(workspace_prefix):
+                rel_path = path_str[len(workspace_prefix):]
+            else:
+                rel_path = str(file_path.relative_to(workspace_path))
+            rel_files.append((rel_path, file_path))
+        rel_files.sort(key=lambda rel_file: rel_file[0].split(os.sep))
+        sorted_files = [file_path for _, file_path in rel_files]
+
+        # Reads are I/O bound, so overlap them across a small thread pool sized
+        # to the workload; a handful of files isn't worth starting threads for
+        if len(sorted_files) < READ_POOL_MIN_FILES:
+            contents = [read_source(file_path) for file_path in sorted_files]
+        else:
+            with ThreadPoolExecutor(max_workers=min(16, len(sorted_files))) as executor:
+                contents = list(executor.map(read_source, sorted_files))
+
+        entries = [
+            (rel_path, content)
+            for (rel_path, _), content in zip(rel_files, contents)
+        ]
+
+        # Every token spans at least one character, so only count tokens when
+        # the raw size could exceed the budget
+        omitted_files = 0
+        omitted_tokens = 0
+        if max_tokens is not None and sum(len(c) for _, c in entries) > max_tokens:
+            token_counts = {rel_path: _count_tokens(content) for rel_path, content in entries}
+            by_priority = sorted(
+                entries,
+                key=lambda entry: (not entry[0].replace(os.sep, "/").startswith(PRIORITY_DIRS), entry[0])
+            )
+
+            included = set()
+            used_tokens = 0
+            for rel_path, _ in by_priority:
+                if used_tokens + token_counts[rel_path] <= max_tokens:
+                    included.add(rel_path)
+                    used_tokens += token_counts[rel_path]
+                else:
+                    omitted_files += 1
+                    omitted_tokens += token_counts[rel_path]
+
+            entries = [entry for entry in entries if entry[0] in included]
+
+        # Write everything into one buffer instead of formatting a string per
+        # file and joining them at the end
+        buffer = io.StringIO()
+
+        # Scaffolded projects often repeat files verbatim; send each distinct
+        # content once and point later copies at the first path
+        first_path_by_content: Dict[str, str] = {}
+
+        for index, (rel_path, content) in enumerate(entries):
+            if index:
+                buffer.write("\n")
+            buffer.write("=== ")
+            buffer.write(rel_path)
+            buffer.write(" ===\n")
+            first_path = first_path_by_content.setdefault(content, rel_path) if content else rel_path
+            if first_path == rel_path:
+                buffer.write(content)
+            else:
+                buffer.write(f"[identical to {first_path}]")
+            buffer.write("\n")
+
+        if omitted_files:
+            buffer.write(f"\n[truncated {omitted_files} files totaling {omitted_tokens} tokens]\n")
+
+        return buffer.getvalue(), omitted_files
+
+    def _total_source_bytes(self, source_files: List[Path]) -> int:
         """
-        context_parts = []
+        Sum the on-disk sizes of the source files.
 
-        for file_path in sorted(source_files):
-            # Get relative path for cleaner display
-            rel_path = file_path.relative_to(workspace_path)
+        Args:
+            source_files: List of source file paths
 
+        Returns:
+            Total size in bytes (files that can't be stat'ed count as empty)
+        """
+        total = 0
+        for file_path in source_files:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                total += os.stat(file_path).st_size
+            except OSError:
+                pass
+        return total
 
-                context_parts.append(f"=== {rel_path} ===\n{content}\n")
-            except Exception as e:
-                context_parts.append(f"=== {rel_path} ===\n[Error reading file: {e}]\n")
+    def _cache_file_content(self, key: Tuple[str, int, int], content: str) -> None:
+        """
+        Add a file's contents to the in-memory LRU, evicting the least recently
+        used entries once FILE_CACHE_MAX_CHARS is exceeded.
+
+        Args:
+            key: (path, mtime_ns, size) of the file when it was read
+            content: Decoded file contents
+        """
+        if len(content) > FILE_CACHE_MAX_CHARS:
+            return
 
-        return "\n".join(context_parts)
+        with self._file_cache_lock:
+            previous = self._file_cache.pop(key, None)
+            if previous is not None:
+                self._file_cache_chars -= len(previous)
+            self._file_cache[key] = content
+            self._file_cache_chars += len(content)
+
+            while self._file_cache_chars > FILE_CACHE_MAX_CHARS:
+                _, evicted = self._file_cache.popitem(last=False)
+                self._file_cache_chars -= len(evicted)
 
     def _parse_rubric(self, rubric_text: str) -> List[str]:
         """
@@ -147,66 +736,49 @@ class RubricJudge:
         Returns:
             List of requirement strings (e.g., ["1. Feature A", "2. Feature B", ...])
         """
-        # Split by lines and filter out empty lines
-        lines = [line.strip() for line in rubric_text.strip().split('\n') if line.strip()]
-
-        # Extract numbered items using regex
-        # Matches: "1. Text", "1) Text", "1 - Text", etc.
-        numbered_pattern = re.compile(r'^\d+[\.\)]\s*.+')
-
-        rubric_items = []
-        for line in lines:
-            if numbered_pattern.match(line):
-                rubric_items.append(line)
-
-        return rubric_items
+        # One regex scan over the whole text finds and trims every numbered line
+        return [match.group(1) for match in _RUBRIC_ITEM_RE.finditer(rubric_text)]
 
     def _load_system_log(self, workspace_path: Path) -> str:
         """
-        Load system.log from the episode logs directory.
+        Load the end of system.log from the episode logs directory.
 
         Args:
             workspace_path: Path to the workspace directory
 
         Returns:
-            Contents of system.log or empty string if not found
+            Last SYSTEM_LOG_PROMPT_CHARS characters of system.log (where build
+            errors end up), or empty string if not found
         """
         # System log is in runs/<timestamp>/logs/system.log
         # Workspace is runs/<timestamp>/workspace
         episode_dir = workspace_path.parent
         system_log_path = episode_dir / "logs" / "system.log"
 
-        if not system_log_path.exists():
-            return ""
-
         try:
-            with open(system_log_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return read_log_tail(system_log_path, SYSTEM_LOG_PROMPT_CHARS)
+        except FileNotFoundError:
+            return ""
         except Exception as e:
             print(f"⚠️ Warning: Could not read system.log: {e}")
             return ""
 
-    def _evaluate_single_item(
+    def _build_item_messages(
         self,
         rubric_item: str,
         code_context: str,
         system_log: str
-    ) -> Dict:
+    ) -> List[Dict]:
         """
-        Evaluate a single rubric item using evidence-based grading.
+        Build the chat messages asking the LLM to verify one rubric item.
 
         Args:
             rubric_item: Single rubric requirement string
             code_context: Assembled source code
-            system_log: Contents of system.log (build/install output)
+            system_log: Start of system.log (build/install output), already truncated
 
         Returns:
-            Evaluation result with format:
-            {
-                "item": "1. Feature description...",
-                "status": "PASS" or "FAIL",
-                "evidence": "file.ts:42 - description"
-            }
+            List of message dicts for LLM API
         """
         system_prompt = """You are a Senior QA Engineer performing evidence-based code review.
 
@@ -236,9 +808,15 @@ Response format:
   "evidence": "app/auth/route.ts:42-55 - POST endpoint with supabase.auth.signUp call"
 }"""
 
-        user_message = f"""# Requirement to Verify
-
-{rubric_item}
+        # The code and logs are the same for every item, so they go in the
+        # system message and only the requirement varies; providers can then
+        # reuse the cached prefix across an evaluation's calls. Build that
+        # message once per evaluation rather than copying the code per item.
+        cached = self._item_system_message
+        if cached is not None and cached[0] is code_context and cached[1] is system_log:
+            system_message = cached[2]
+        else:
+            system_content = f"""{system_prompt}
 
 # Source Code
 
@@ -246,61 +824,486 @@ Response format:
 
 # System Logs (Build/Install Output)
 
-{system_log[:5000]}  # Truncate to first 5000 chars
+{system_log}"""
+
+            if self._explicit_prompt_caching:
+                system_content = [
+                    {"type": "text", "text": system_content, "cache_control": {"type": "ephemeral"}}
+                ]
+
+            system_message = {"role": "system", "content": system_content}
+            self._item_system_message = (code_context, system_log, system_message)
+
+        user_message = f"""# Requirement to Verify
+
+{rubric_item}
 
 Verify the requirement and respond with JSON only."""
 
+        # Copy the dict (and content parts, if any) but share the large content
+        # string, so a provider adapter mutating them can't leak into other items
+        system_message = dict(system_message)
+        if isinstance(system_message["content"], list):
+            system_message["content"] = [
+                {
+                    key: dict(value) if isinstance(value, dict) else value
+                    for key, value in part.items()
+                }
+                for part in system_message["content"]
+            ]
         messages = [
-            {"role": "system", "content": system_prompt},
+            system_message,
             {"role": "user", "content": user_message}
         ]
 
+        return messages
+
+    def _load_response_json(self, response_text: str):
+        """
+        Decode the JSON object in an LLM response.
+
+        Args:
+            response_text: Raw message content returned by the LLM
+
+        Returns:
+            Decoded JSON value
+
+        Raises:
+            ValueError: If no JSON object can be decoded
+        """
+        response_text = response_text.strip()
+
+        # Most responses are bare JSON; only fall back to extracting the
+        # object from a markdown code block, or the outermost {...}, if that fails
         try:
-            response = litellm.completion(
-                model=self.model,
-                messages=messages,
-                temperature=0.2,  # Low temperature for factual verification
-                max_tokens=1000,
-                num_retries=3,
-                timeout=60
-            )
+            return _json_loads(response_text)
+        except json.JSONDecodeError:
+            if "```" in response_text:
+                match = _JSON_FENCE_RE.search(response_text)
+                if match is not None:
+                    return _json_loads(match.group(1))
+            match = _JSON_OBJECT_RE.search(response_text)
+            if match is None:
+                raise
+            return _json_loads(match.group(0))
+
+    def _parse_item_response(self, rubric_item: str, response_text: str) -> Dict:
+        """
+        Parse the LLM's verdict for one rubric item.
+
+        Args:
+            rubric_item: Rubric requirement the response is about
+            response_text: Raw message content returned by the LLM
 
-            response_text = response.choices[0].message.content.strip()
+        Returns:
+            Evaluation result with "item", "status" and "evidence" keys
 
-            # Handle markdown code blocks
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                json_lines = []
-                in_block = False
-                for line in lines:
-                    if line.startswith("```"):
-                        in_block = not in_block
-                        continue
-                    if in_block or (not line.startswith("```") and "{" in line):
-                        json_lines.append(line)
-                response_text = "\n".join(json_lines)
+        Raises:
+            ValueError: If the response is not a JSON verdict
+        """
+        return _normalize_verdict(self._load_response_json(response_text), rubric_item)
 
-            result = json.loads(response_text)
+    async def _aevaluate_single_item(
+        self,
+        rubric_item: str,
+        code_context: str,
+        system_log: str
+    ) -> Dict:
+        """
+        Evaluate a single rubric item using evidence-based grading.
 
-            # Validate structure
-            if "status" not in result or "evidence" not in result:
-                raise ValueError("LLM response missing 'status' or 'evidence'")
+        Args:
+            rubric_item: Single rubric requirement string
+            code_context: Assembled source code
+            system_log: Start of system.log (build/install output), already truncated
 
-            # Ensure the item field is present
-            if "item" not in result:
-                result["item"] = rubric_item
+        Returns:
+            Evaluation result with format:
+            {
+                "item": "1. Feature description...",
+                "status": "PASS" or "FAIL",
+                "evidence": "file.ts:42 - description"
+            }
+            If the call or its response fails, the result is a FAIL with
+            "error": True, which keeps it out of the result caches.
+        """
+        messages = self._build_item_messages(rubric_item, code_context, system_log)
 
-            return result
+        # ~4 characters per prompt token (instructions included), plus the
+        # full completion budget
+        debited_tokens = await self._rate_limiter.acquire(
+            (len(code_context) + len(system_log) + len(rubric_item) + 2000) // 4
+            + ITEM_RESPONSE_MAX_TOKENS
+        )
+
+        try:
+            response = await self._litellm.acompletion(
+                model=self.model,
+                messages=messages,
+                max_tokens=ITEM_RESPONSE_MAX_TOKENS,
+                num_retries=3,
+                timeout=60,
+                **self._completion_kwargs
+            )
+            self._rate_limiter.settle(debited_tokens, response)
+
+            return self._parse_item_response(rubric_item, response.choices[0].message.content)
 
         except Exception as e:
             print(f"❌ Error evaluating item: {e}")
             return {
                 "item": rubric_item,
                 "status": "FAIL",
-                "evidence": f"Evaluation error: {str(e)}"
+                "evidence": f"Evaluation error: {str(e)}",
+                "error": True
             }
 
-    def _evaluate_batch(
+    def _prefail_missing_technologies(
+        self,
+        rubric_items: List[str],
+        code_context: str,
+        omitted_files: int
+    ) -> Dict[int, Dict]:
+        """
+        Fail rubric items that require a technology the code never references.
+
+        Only "uses <technology>" phrasings count, and not when negated or
+        given as an example ("does not use", "e.g. using") or when the same
+        clause offers an alternative ("or a mock"). Nothing is pre-failed
+        when files were left out of the context.
+
+        Args:
+            rubric_items: List of rubric requirement strings
+            code_context: Assembled source code
+            omitted_files: Number of source files left out of code_context
+
+        Returns:
+            Evaluation results keyed by the index of each pre-failed item
+        """
+        # A technology missing from a truncated context may be in a dropped file
+        if omitted_files:
+            return {}
+
+        code_lower = None
+        prefailed = {}
+
+        for index, rubric_item in enumerate(rubric_items):
+            for match in _TECHNOLOGY_RE.finditer(rubric_item):
+                if _TECHNOLOGY_NEGATION_RE.search(rubric_item, 0, match.start()):
+                    continue
+                clause = re.split(r'[;.\n]', rubric_item[match.end():], maxsplit=1)[0]
+                if _TECHNOLOGY_ALTERNATIVE_RE.search(clause):
+                    continue
+                if code_lower is None:
+                    code_lower = code_context.lower()
+                name = match.group(1).lower()
+                if not any(keyword in code_lower for keyword in TECHNOLOGY_KEYWORDS[name]):
+                    prefailed[index] = {
+                        "item": rubric_item,
+                        "status": "FAIL",
+                        "evidence": f"Keyword pre-check: no reference to '{match.group(1)}' in the source code"
+                    }
+                    break
+
+        return prefailed
+
+    def _items_per_call(self, rubric_items: List[str], code_context: str, system_log: str) -> int:
+        """
+        Work out how many rubric items one multi-item call can judge.
+
+        Args:
+            rubric_items: List of rubric requirement strings
+            code_context: Assembled source code
+            system_log: Start of system.log (build/install output), already truncated
+
+        Returns:
+            Maximum number of items per call (at most len(rubric_items)), or 0
+            if the model's context window is unknown or the code doesn't fit
+        """
+        context_tokens = MODEL_CONTEXT_TOKENS.get(self.model)
+        if context_tokens is None or not rubric_items:
+            return 0
+
+        max_items = min(len(rubric_items), COMBINED_RESPONSE_MAX_TOKENS // ITEM_RESPONSE_MAX_TOKENS)
+        available = context_tokens - CONTEXT_SAFETY_TOKENS
+
+        # Every token spans at least one character, so character counts are an
+        # upper bound; only count tokens when that bound doesn't fit
+        base_tokens = len(code_context) + len(system_log)
+        per_item_tokens = max(map(len, rubric_items)) + ITEM_RESPONSE_MAX_TOKENS
+        if base_tokens + per_item_tokens * max_items >= available:
+            base_tokens = _count_tokens(code_context) + _count_tokens(system_log)
+            per_item_tokens = max(map(_count_tokens, rubric_items)) + ITEM_RESPONSE_MAX_TOKENS
+
+        return max(0, min(max_items, (available - base_tokens) // per_item_tokens))
+
+    async def _aevaluate_all_items(
+        self,
+        rubric_items: List[str],
+        code_context: str,
+        system_log: str
+    ) -> Optional[List[Dict]]:
+        """
+        Evaluate several rubric items (up to the whole rubric) in one LLM call.
+
+        The source code and logs are sent (and prefilled) once instead of once
+        per item.
+
+        Args:
+            rubric_items: List of rubric requirement strings
+            code_context: Assembled source code
+            system_log: Start of system.log (build/install output), already truncated
+
+        Returns:
+            Evaluation results in rubric order, or None if the call failed or
+            the response didn't cover every item
+        """
+        system_prompt = """You are a Senior QA Engineer performing evidence-based code review.
+
+Your task is to verify whether each of a list of requirements is implemented in the codebase.
+
+CRITICAL RULES:
+1. For PASS, you MUST cite the specific file path and line number where the requirement is implemented.
+2. If you cannot find concrete evidence in the code, mark it as FAIL.
+3. Do not hallucinate or assume code exists. Only cite code you can actually see.
+4. Use system logs (build/install output) as supporting evidence when relevant.
+
+You will be given:
+- A numbered list of requirements to verify
+- The complete source code
+- System logs (build, install, server output)
+
+For every requirement, determine:
+- Status: PASS or FAIL
+- Evidence: File path, line numbers, and brief explanation (for PASS) OR reason for failure (for FAIL)
+
+CRITICAL: You must respond with valid JSON only. No markdown, no code blocks, just pure JSON.
+
+Response format (one entry per requirement, in the order given):
+{
+  "results": [
+    {
+      "item": "1. Application implements user registration...",
+      "status": "PASS",
+      "evidence": "app/auth/route.ts:42-55 - POST endpoint with supabase.auth.signUp call"
+    }
+  ]
+}"""
+
+        requirements = "\n".join(rubric_items)
+        user_message = f"""# Requirements to Verify
+
+{requirements}
+
+# Source Code
+
+{code_context}
+
+# System Logs (Build/Install Output)
+
+{system_log}
+
+Verify every requirement and respond with JSON only."""
+
+        response_tokens = ITEM_RESPONSE_MAX_TOKENS * len(rubric_items)
+        debited_tokens = await self._rate_limiter.acquire(
+            (len(system_prompt) + len(user_message)) // 4 + response_tokens
+        )
+
+        try:
+            response = await self._litellm.acompletion(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_message}
+                ],
+                max_tokens=response_tokens,
+                num_retries=3,
+                timeout=120,
+                **self._completion_kwargs
+            )
+            self._rate_limiter.settle(debited_tokens, response)
+
+            payload = self._load_response_json(response.choices[0].message.content)
+            entries = payload.get("results") if isinstance(payload, dict) else None
+            if not isinstance(entries, list) or len(entries) != len(rubric_items):
+                raise ValueError(f"expected {len(rubric_items)} results in LLM response")
+
+            return [
+                _normalize_verdict(entry, rubric_item)
+                for rubric_item, entry in zip(rubric_items, entries)
+            ]
+
+        except Exception as e:
+            print(f"⚠️ Single-call evaluation failed, evaluating items separately: {e}")
+            return None
+
+    async def _aevaluate_packed_items(
+        self,
+        packs: List[List[str]],
+        code_context: str,
+        system_log: str
+    ) -> List[Dict]:
+        """
+        Evaluate packs of rubric items with one multi-item call per pack.
+
+        Packs run concurrently (at most max_concurrency), or one at a time
+        with step_delay seconds in between when step_delay is set. A pack
+        whose call fails is evaluated item by item.
+
+        Args:
+            packs: Rubric items grouped by call
+            code_context: Assembled source code
+            system_log: Start of system.log (build/install output), already truncated
+
+        Returns:
+            Evaluation results in rubric order
+        """
+        async def run_pack(pack: List[str]) -> List[Dict]:
+            pack_results = await self._aevaluate_all_items(pack, code_context, system_log)
+            if pack_results is None:
+                pack_results = await self._aevaluate_batch(pack, code_context, system_log)
+            return pack_results
+
+        results = []
+        if self.step_delay > 0:
+            # Paced mode: one pack at a time with a delay in between
+            for pack_num, pack in enumerate(packs, start=1):
+                results.extend(await run_pack(pack))
+                if pack_num < len(packs):
+                    await asyncio.sleep(self.step_delay)
+            return results
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_limited(pack: List[str]) -> List[Dict]:
+            async with semaphore:
+                return await run_pack(pack)
+
+        for pack_results in await asyncio.gather(*(run_limited(pack) for pack in packs)):
+            results.extend(pack_results)
+
+        return results
+
+    async def _aevaluate_with_batch_api(
+        self,
+        rubric_items: List[str],
+        code_context: str,
+        system_log: str
+    ) -> Optional[List[Dict]]:
+        """
+        Evaluate all rubric items in a single provider batch job.
+
+        Uploads one chat completion request per item as JSONL, polls the job
+        every BATCH_POLL_INTERVAL seconds and parses the output file.
+
+        Args:
+            rubric_items: List of rubric requirement strings
+            code_context: Assembled source code
+            system_log: Start of system.log (build/install output), already truncated
+
+        Returns:
+            Evaluation results in rubric order, or None if the provider has no
+            batch API or the job could not be completed
+        """
+        try:
+            model_name, provider, _, _ = self._litellm.get_llm_provider(self.model)
+        except Exception as e:
+            print(f"⚠️ Could not determine provider for batch API: {e}")
+            return None
+
+        if provider not in BATCH_API_PROVIDERS:
+            print(f"⚠️ Batch API not supported for provider '{provider}', using direct calls")
+            return None
+
+        requests = []
+        for index, rubric_item in enumerate(rubric_items):
+            requests.append(_json_dumps({
+                "custom_id": f"item-{index}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model_name,
+                    "messages": self._build_item_messages(rubric_item, code_context, system_log),
+                    "max_tokens": ITEM_RESPONSE_MAX_TOKENS,
+                    **self._completion_kwargs
+                }
+            }))
+
+        try:
+            input_file = await self._litellm.acreate_file(
+                file=("rubric-batch.jsonl", b"\n".join(requests)),
+                purpose="batch",
+                custom_llm_provider=provider
+            )
+            batch = await self._litellm.acreate_batch(
+                completion_window="24h",
+                endpoint="/v1/chat/completions",
+                input_file_id=input_file.id,
+                custom_llm_provider=provider
+            )
+            print(f"📦 Submitted batch job {batch.id} with {len(rubric_items)} items")
+
+            while batch.status not in BATCH_TERMINAL_STATUSES:
+                await asyncio.sleep(BATCH_POLL_INTERVAL)
+                batch = await self._litellm.aretrieve_batch(batch_id=batch.id, custom_llm_provider=provider)
+
+            if batch.status != "completed" or not batch.output_file_id:
+                raise RuntimeError(f"batch job {batch.id} ended with status '{batch.status}'")
+
+            output = await self._litellm.afile_content(
+                file_id=batch.output_file_id,
+                custom_llm_provider=provider
+            )
+        except Exception as e:
+            print(f"⚠️ Batch API evaluation failed, using direct calls: {e}")
+            return None
+
+        # Output lines come back in any order, keyed by custom_id
+        response_texts = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = _json_loads(line)
+                response_texts[record["custom_id"]] = (
+                    record["response"]["body"]["choices"][0]["message"]["content"]
+                )
+            except (ValueError, KeyError, IndexError, TypeError):
+                continue
+
+        results = []
+        missing_indices = []
+        for index, rubric_item in enumerate(rubric_items):
+            response_text = response_texts.get(f"item-{index}")
+            if response_text is None:
+                missing_indices.append(index)
+                results.append(None)
+                continue
+            try:
+                results.append(self._parse_item_response(rubric_item, response_text))
+            except Exception as e:
+                print(f"❌ Error evaluating item: {e}")
+                results.append({
+                    "item": rubric_item,
+                    "status": "FAIL",
+                    "evidence": f"Evaluation error: {str(e)}",
+                    "error": True
+                })
+
+        # Items whose output line is missing or malformed get a direct call
+        if missing_indices:
+            print(f"⚠️ {len(missing_indices)} items missing from batch output, using direct calls")
+            direct_results = await asyncio.gather(*(
+                self._aevaluate_single_item(rubric_items[index], code_context, system_log)
+                for index in missing_indices
+            ))
+            for index, result in zip(missing_indices, direct_results):
+                results[index] = result
+
+        return results
+
+    async def _aevaluate_batch(
         self,
         batch_items: List[str],
         code_context: str,
@@ -312,7 +1315,7 @@ Verify the requirement and respond with JSON only."""
         Args:
             batch_items: List of rubric requirement strings
             code_context: Assembled source code
-            system_log: Contents of system.log (build/install output)
+            system_log: Start of system.log (build/install output), already truncated
 
         Returns:
             List of evaluation results with format:
@@ -325,14 +1328,26 @@ Verify the requirement and respond with JSON only."""
                 ...
             ]
         """
-        results = []
-
         # Calculate delay between individual items
         item_delay = math.ceil(self.step_delay / 3) if self.step_delay > 0 else 0
 
+        if item_delay == 0:
+            # Items are independent, so overlap their round-trips; gather()
+            # keeps the results in item order
+            return list(await asyncio.gather(*(
+                self._aevaluate_single_item(
+                    rubric_item=item,
+                    code_context=code_context,
+                    system_log=system_log
+                )
+                for item in batch_items
+            )))
+
+        results = []
+
         for idx, item in enumerate(batch_items):
             # Evaluate single item
-            result = self._evaluate_single_item(
+            result = await self._aevaluate_single_item(
                 rubric_item=item,
                 code_context=code_context,
                 system_log=system_log
@@ -341,11 +1356,24 @@ Verify the requirement and respond with JSON only."""
 
             # Add delay between items (but not after the last one in the batch)
             if item_delay > 0 and idx < len(batch_items) - 1:
-                print(f"    ⏱️  Item delay: {item_delay}s...")
-                time.sleep(item_delay)
+                await asyncio.sleep(item_delay)
 
         return results
 
+    def _print_batch_summary(
+        self,
+        batch_num: int,
+        num_batches: int,
+        batch_results: List[Dict],
+        batch_start: float
+    ) -> None:
+        """Print one progress line for a finished batch."""
+        passed = sum(1 for item in batch_results if item.get("status") == "PASS")
+        print(
+            f"  ✓ Batch {batch_num}/{num_batches}: {passed}/{len(batch_results)} passed "
+            f"in {time.monotonic() - batch_start:.1f}s"
+        )
+
     def _build_prompt(self, user_prompt: str, rubric: str, code_context: str) -> List[Dict]:
         """
         Build the LLM prompt messages.
@@ -399,15 +1427,122 @@ Evaluate the code based on the rubric above. Respond with JSON only."""
             {"role": "user", "content": user_message}
         ]
 
-    def evaluate(self, workspace_path: str, prompt: str, rubric: str, system_log: str = "") -> dict:
+    def _cache_key(self, prompt: str, rubric: str, code_context: str, system_log: str) -> str:
+        """Hash everything that determines an evaluation result."""
+        hasher = hashlib.blake2b(digest_size=16)
+        for part in (self._cache_settings, prompt, rubric, code_context, system_log):
+            hasher.update(part.encode("utf-8"))
+            hasher.update(b"\0")
+        return hasher.hexdigest()
+
+    def _item_context_hash(self, code_context: str, system_log: str) -> str:
+        """Hash the code and log excerpt that single-item verdicts depend on."""
+        hasher = hashlib.blake2b(digest_size=16)
+        for part in (self._cache_settings, code_context, system_log):
+            hasher.update(part.encode("utf-8"))
+            hasher.update(b"\0")
+        return hasher.hexdigest()
+
+    def _item_cache_key(self, context_hash: str, rubric_item: str) -> str:
+        """Cache key for one rubric item's verdict against a hashed context."""
+        item_hash = hashlib.blake2b(
+            f"{context_hash}\0{rubric_item}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        return f"item-{item_hash}"
+
+    def _load_cached_result(self, key: str) -> Optional[dict]:
+        """Return a previously stored evaluation result, or None on a miss."""
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self.cache_dir / f"{key}.json", 'rb') as f:
+                return _json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _store_cached_result(self, key: str, result: dict) -> None:
+        """Persist an evaluation result (atomically, so readers never see partial files)."""
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_dir / f"{key}.json.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(_json_dumps(result))
+            os.replace(tmp_path, self.cache_dir / f"{key}.json")
+        except OSError as e:
+            print(f"⚠️ Warning: Could not write rubric cache: {e}")
+
+    def prepare_code_context(self, workspace_path: str) -> Tuple[List[Path], str, int]:
+        """
+        Discover and assemble the workspace's source code ahead of evaluate().
+
+        This only reads files (no printing, no LLM calls, no LiteLLM import),
+        so it can run in a background thread while the grader installs and
+        builds the app. Pass the result to evaluate() as prepared_context.
+
+        Args:
+            workspace_path: Path to the workspace directory
+
+        Returns:
+            Tuple of (source file paths, assembled code context, number of
+            files left out of the context by max_context_tokens)
+        """
+        workspace = Path(workspace_path).resolve()
+        source_files = self._discover_source_files(workspace)
+        if not source_files:
+            return [], "", 0
+        code_context, omitted_files = self._assemble_code_context(
+            workspace, source_files, max_tokens=self.max_context_tokens
+        )
+        return source_files, code_context, omitted_files
+
+    def evaluate(
+        self,
+        workspace_path: str,
+        prompt: str,
+        rubric: str,
+        system_log: str = "",
+        prepared_context: Optional[Tuple[List[Path], str, int]] = None
+    ) -> dict:
         """
         Evaluate agent-generated code using batched, evidence-based grading.
 
+        Synchronous wrapper around aevaluate(); must not be called from inside
+        a running event loop (await aevaluate() there instead).
+
+        Args and return value are the same as aevaluate().
+        """
+        return asyncio.run(self.aevaluate(
+            workspace_path=workspace_path,
+            prompt=prompt,
+            rubric=rubric,
+            system_log=system_log,
+            prepared_context=prepared_context
+        ))
+
+    async def aevaluate(
+        self,
+        workspace_path: str,
+        prompt: str,
+        rubric: str,
+        system_log: str = "",
+        prepared_context: Optional[Tuple[List[Path], str, int]] = None
+    ) -> dict:
+        """
+        Evaluate agent-generated code using batched, evidence-based grading.
+
+        LLM calls go through litellm.acompletion and file I/O runs in worker
+        threads, so several workspaces can be judged concurrently with
+        asyncio.gather().
+
         Args:
             workspace_path: Path to the workspace directory
             prompt: Original task prompt given to the agent (not used in batched mode)
             rubric: Grading rubric as a numbered list
             system_log: System log contents (build/install output)
+            prepared_context: Result of prepare_code_context() for this workspace
+                             (optional, discovered and assembled here if None)
 
         Returns:
             Dict with:
@@ -430,14 +1565,39 @@ Evaluate the code based on the rubric above. Respond with JSON only."""
                 }
             }
         """
+        try:
+            return await self._aevaluate_workspace(
+                workspace_path, prompt, rubric, system_log, prepared_context
+            )
+        finally:
+            # Don't keep the (possibly multi-MB) code context alive between evaluations
+            self._item_system_message = None
+
+    async def _aevaluate_workspace(
+        self,
+        workspace_path: str,
+        prompt: str,
+        rubric: str,
+        system_log: str = "",
+        prepared_context: Optional[Tuple[List[Path], str, int]] = None
+    ) -> dict:
+        """Evaluate a workspace; see aevaluate()."""
         workspace = Path(workspace_path).resolve()
 
         if not workspace.exists():
             raise ValueError(f"Workspace does not exist: {workspace_path}")
 
-        print("🔍 Discovering source files...")
-        source_files = self._discover_source_files(workspace)
-        print(f"Found {len(source_files)} source files")
+        self._setup_llm()
+
+        omitted_files = 0
+        if prepared_context is not None:
+            source_files, code_context, omitted_files = prepared_context
+            print(f"📝 Using pre-assembled code context ({len(source_files)} source files)")
+        else:
+            print("🔍 Discovering source files...")
+            source_files = await asyncio.to_thread(self._discover_source_files, workspace)
+            print(f"Found {len(source_files)} source files")
+            code_context = None
 
         if not source_files:
             print("⚠️ Warning: No source files found to evaluate")
@@ -453,13 +1613,49 @@ Evaluate the code based on the rubric above. Respond with JSON only."""
                 }
             }
 
-        print("📝 Assembling code context...")
-        code_context = self._assemble_code_context(workspace, source_files)
+        # A near-empty workspace can't meet any requirement; don't spend LLM
+        # calls (or context assembly) finding that out
+        source_bytes = await asyncio.to_thread(self._total_source_bytes, source_files)
+        if source_bytes < MIN_SOURCE_BYTES:
+            print(f"⚠️ Warning: Only {source_bytes} bytes of source code, failing all requirements")
+            rubric_items = self._parse_rubric(rubric)
+            return {
+                "score": 0.0,
+                "reasoning": f"Workspace contains no substantive source code ({source_bytes} bytes)",
+                "breakdown": [
+                    {
+                        "item": rubric_item,
+                        "status": "FAIL",
+                        "evidence": "Workspace contains no substantive source code"
+                    }
+                    for rubric_item in rubric_items
+                ],
+                "metadata": {
+                    "files_evaluated": len(source_files),
+                    "model": self.model,
+                    "total_items": len(rubric_items),
+                    "passed_items": 0
+                }
+            }
+
+        if code_context is None:
+            print("📝 Assembling code context...")
+            code_context, omitted_files = await asyncio.to_thread(
+                self._assemble_code_context, workspace, source_files, self.max_context_tokens
+            )
 
         # If system_log not provided, try to load it
         if not system_log:
             print("📋 Loading system logs...")
-            system_log = self._load_system_log(workspace)
+            system_log = await asyncio.to_thread(self._load_system_log, workspace)
+
+        # Unchanged code, logs and rubric give the same verdict - reuse it
+        cache_key = self._cache_key(prompt, rubric, code_context, system_log)
+        cached_result = self._load_cached_result(cache_key)
+        if cached_result is not None:
+            print("♻️ Reusing cached evaluation for unchanged workspace")
+            cached_result["metadata"]["cached"] = True
+            return cached_result
 
         print("🔢 Parsing rubric...")
         rubric_items = self._parse_rubric(rubric)
@@ -479,36 +1675,149 @@ Evaluate the code based on the rubric above. Respond with JSON only."""
                 }
             }
 
-        # Split rubric into batches
-        all_results = []
-        num_batches = (len(rubric_items) + self.batch_size - 1) // self.batch_size
-
-        print(f"🤖 Evaluating in {num_batches} batches of {self.batch_size}...")
+        # Every item's prompt shares the same context, so slice the log once
+        log_excerpt = system_log[-SYSTEM_LOG_PROMPT_CHARS:]
 
-        for i in range(0, len(rubric_items), self.batch_size):
-            batch_num = (i // self.batch_size) + 1
-            batch_items = rubric_items[i:i + self.batch_size]
+        # Items requiring a technology the code never mentions can't pass
+        prefailed = (
+            self._prefail_missing_technologies(rubric_items, code_context, omitted_files)
+            if self.prefail_technologies else {}
+        )
+        if prefailed:
+            print(f"⏭️  {len(prefailed)} items fail the keyword pre-check")
+
+        # Reuse verdicts for items already judged against this exact code and
+        # log, e.g. when only part of the rubric changed
+        item_cache_keys = {}
+        cached_items = {}
+        if self.cache_dir is not None:
+            context_hash = self._item_context_hash(code_context, log_excerpt)
+            for index, rubric_item in enumerate(rubric_items):
+                if index in prefailed:
+                    continue
+                item_cache_keys[index] = self._item_cache_key(context_hash, rubric_item)
+                cached_item = self._load_cached_result(item_cache_keys[index])
+                if cached_item is not None:
+                    cached_items[index] = cached_item
+            if cached_items:
+                print(f"♻️ Reusing {len(cached_items)} cached item verdicts")
 
-            print(f"  Batch {batch_num}/{num_batches}: Evaluating {len(batch_items)} items...")
+        known_results = {**prefailed, **cached_items}
+        judged_items = [item for index, item in enumerate(rubric_items) if index not in known_results]
 
-            batch_results = self._evaluate_batch(
-                batch_items=batch_items,
-                code_context=code_context,
-                system_log=system_log
+        # Split rubric into batches
+        all_results = []
+        passed_items = 0
+        batches = [
+            judged_items[i:i + self.batch_size]
+            for i in range(0, len(judged_items), self.batch_size)
+        ]
+        num_batches = len(batches)
+
+        # Paths that judge the whole rubric at once; None means fall back to
+        # per-item calls
+        single_job_results = None if judged_items else []
+        if not judged_items:
+            num_batches = 0
+
+        if judged_items and self.use_batch_api:
+            print(f"📦 Evaluating {len(judged_items)} items with the provider batch API...")
+            single_job_results = await self._aevaluate_with_batch_api(
+                judged_items, code_context, log_excerpt
             )
+            if single_job_results is not None:
+                num_batches = 1
 
-            all_results.extend(batch_results)
+        items_per_call = (
+            self._items_per_call(judged_items, code_context, log_excerpt)
+            if single_job_results is None and self.combine_items else 0
+        )
+        if items_per_call >= len(judged_items) > 0:
+            print(f"🤖 Evaluating all {len(judged_items)} items in a single call...")
+            single_job_results = await self._aevaluate_all_items(
+                judged_items, code_context, log_excerpt
+            )
+            if single_job_results is not None:
+                num_batches = 1
+        elif items_per_call > 1:
+            # Too much for one call: pack as many items per call as fit
+            packs = [
+                judged_items[i:i + items_per_call]
+                for i in range(0, len(judged_items), items_per_call)
+            ]
+            num_batches = len(packs)
+            print(f"🤖 Evaluating in {num_batches} calls of up to {items_per_call} items...")
+            single_job_results = await self._aevaluate_packed_items(
+                packs, code_context, log_excerpt
+            )
 
-            print(f"  ✓ Batch {batch_num} complete")
+        if single_job_results is None:
+            print(f"🤖 Evaluating in {num_batches} batches of {self.batch_size}...")
+
+        if single_job_results is not None:
+            # Judged without the per-item batches (or nothing needed judging)
+            all_results = single_job_results
+            passed_items = sum(1 for item in all_results if item.get("status") == "PASS")
+        elif self.step_delay > 0:
+            # Paced mode: one batch at a time with a delay in between
+            for batch_num, batch_items in enumerate(batches, start=1):
+                batch_start = time.monotonic()
+                batch_results = await self._aevaluate_batch(
+                    batch_items=batch_items,
+                    code_context=code_context,
+                    system_log=log_excerpt
+                )
+
+                all_results.extend(batch_results)
+                passed_items += sum(1 for item in batch_results if item.get("status") == "PASS")
+
+                if self.verbose:
+                    self._print_batch_summary(batch_num, num_batches, batch_results, batch_start)
+
+                # Add delay between batches (but not after the last one)
+                if batch_num < num_batches:
+                    await asyncio.sleep(self.step_delay)
+        else:
+            # Run batches concurrently, at most max_concurrency in flight
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def run_batch(batch_num: int, batch_items: List[str]) -> List[Dict]:
+                async with semaphore:
+                    batch_start = time.monotonic()
+                    batch_results = await self._aevaluate_batch(
+                        batch_items=batch_items,
+                        code_context=code_context,
+                        system_log=log_excerpt
+                    )
+                    if self.verbose:
+                        self._print_batch_summary(batch_num, num_batches, batch_results, batch_start)
+                    return batch_results
+
+            # gather() returns results in batch order, regardless of completion order
+            for batch_results in await asyncio.gather(
+                *(run_batch(batch_num, batch_items) for batch_num, batch_items in enumerate(batches, start=1))
+            ):
+                all_results.extend(batch_results)
+                passed_items += sum(1 for item in batch_results if item.get("status") == "PASS")
+
+        # Put the pre-failed and cached items back in rubric order
+        if known_results:
+            judged_results = iter(all_results)
+            all_results = [
+                known_results[index] if index in known_results else next(judged_results)
+                for index in range(len(rubric_items))
+            ]
+            passed_items += sum(1 for item in cached_items.values() if item.get("status") == "PASS")
 
-            # Add delay between batches (but not after the last one)
-            if self.step_delay > 0 and batch_num < num_batches:
-                print(f"  ⏱️  Waiting {self.step_delay}s before next batch...")
-                time.sleep(self.step_delay)
+        # Remember fresh verdicts per item (but not transient failures)
+        for index, key in item_cache_keys.items():
+            if index not in cached_items:
+                item_result = all_results[index]
+                if not item_result.get("error"):
+                    self._store_cached_result(key, item_result)
 
         # Calculate stats
         total_items = len(all_results)
-        passed_items = sum(1 for item in all_results if item.get("status") == "PASS")
 
         # Score = ratio of passed items (0.0 to 1.0)
         score = passed_items / total_items if total_items > 0 else 0.0
@@ -520,7 +1829,7 @@ Evaluate the code based on the rubric above. Respond with JSON only."""
 
         print(f"✅ Evaluation complete: {passed_items}/{total_items} passed → Score: {score:.1%}")
 
-        return {
+        result = {
             "score": score,
             "reasoning": reasoning,
             "breakdown": all_results,
@@ -531,3 +1840,31 @@ Evaluate the code based on the rubric above. Respond with JSON only."""
                 "passed_items": passed_items
             }
         }
+
+        # Don't cache transient failures (API errors, unparseable responses)
+        if not any(item.get("error") for item in all_results):
+            self._store_cached_result(cache_key, result)
+
+        return result
+
+
+def prepare_code_context(
+    workspace_path: str,
+    max_context_tokens: Optional[int] = 100_000
+) -> Tuple[List[Path], str, int]:
+    """
+    Discover and assemble a workspace's source code without creating the judge.
+
+    Equivalent to RubricJudge(max_context_tokens=...).prepare_code_context(),
+    for callers that only create their judge once they know it will run.
+
+    Args:
+        workspace_path: Path to the workspace directory
+        max_context_tokens: Token budget for the assembled source code (see RubricJudge)
+
+    Returns:
+        Tuple of (source file paths, assembled code context, number of files
+        left out of the context)
+    """
+    reader = RubricJudge(max_context_tokens=max_context_tokens, cache_dir=None)
+    return reader.prepare_code_context(workspace_path)
@@ -0,0 +1,249 @@
+"""
+Tests for grader.grade helpers that don't need pnpm or Node.js.
+"""
+
+import sys
+
+import pytest
+
+from grader import grade
+from grader.grade import Grader
+
+
+@pytest.fixture
+def trash_dir(tmp_path, monkeypatch):
+    """Point Grader._discard_dir at a per-test trash directory."""
+    path = tmp_path / "trash"
+    monkeypatch.setattr(grade, "TRASH_DIR", path)
+    return path
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    path = tmp_path / "ws"
+    path.mkdir()
+    return path
+
+
+def _make_node_modules(workspace, packages=20, files_per_package=20):
+    node_modules = workspace / "node_modules"
+    for i in range(packages):
+        package_dir = node_modules / f"pkg{i}"
+        package_dir.mkdir(parents=True)
+        for j in range(files_per_package):
+            (package_dir / f"file{j}.js").write_text("module.exports = 1\n")
+    return node_modules
+
+
+def test_discard_dir_leaves_no_residue(workspace, trash_dir):
+    node_modules = _make_node_modules(workspace)
+    grader = Grader(str(workspace))
+
+    grader._discard_dir(node_modules)
+    assert not node_modules.exists()
+
+    grader._wait_for_discards()
+    assert list(trash_dir.iterdir()) == []
+    assert grader._discard_threads == []
+    assert [p.name for p in workspace.parent.iterdir() if p.name.startswith(".trash")] == []
+
+
+def test_discard_dir_falls_back_to_rmtree_when_rename_fails(workspace, trash_dir, monkeypatch):
+    node_modules = _make_node_modules(workspace, packages=2)
+    grader = Grader(str(workspace))
+
+    def failing_rename(src, dst):
+        raise OSError("cross-device link")
+
+    monkeypatch.setattr(grade.os, "rename", failing_rename)
+    grader._discard_dir(node_modules)
+
+    assert not node_modules.exists()
+    assert grader._discard_threads == []
+
+
+def test_run_all_checks_waits_for_discards_on_exception(workspace, trash_dir, monkeypatch):
+    node_modules = _make_node_modules(workspace)
+    grader = Grader(str(workspace))
+
+    def failing_install():
+        grader._discard_dir(node_modules)
+        raise RuntimeError("install crashed")
+
+    monkeypatch.setattr(grader, "run_install", failing_install)
+    with pytest.raises(RuntimeError):
+        grader.run_all_checks()
+
+    assert grader._discard_threads == []
+    assert list(trash_dir.iterdir()) == []
+
+
+def test_execute_returns_output_tails_only_on_failure(workspace):
+    grader = Grader(str(workspace))
+
+    ok = grader._execute(
+        [sys.executable, "-c", "import sys; print('out'); print('err', file=sys.stderr)"]
+    )
+    assert ok == (True, "", "", 0)
+
+    failed = grader._execute(
+        [sys.executable, "-c", "import sys; print('boom', file=sys.stderr); sys.exit(3)"]
+    )
+    assert failed == (False, "", "boom\n", 3)
+
+
+def test_execute_echoes_stdout_lines(workspace, capfd):
+    grader = Grader(str(workspace))
+
+    grader._execute([sys.executable, "-c", "print('first'); print('zweite é')"], echo=True)
+    assert capfd.readouterr().out == "first\nzweite é\n"
+
+
+def test_server_health_reports_missing_pnpm_as_error(workspace, tmp_path, monkeypatch):
+    log_path = tmp_path / "grader.log"
+    grader = Grader(str(workspace), grader_log_path=str(log_path))
+    monkeypatch.setenv("PATH", str(tmp_path / "empty-bin"))
+
+    assert grader.check_server_health(port=39517, timeout=1) is False
+
+    log = log_path.read_text()
+    assert "[SERVER] ERROR" in log
+    assert "HTTP request failed" not in log
+
+
+def _elf_header(machine: int, big_endian: bool = False) -> bytes:
+    byteorder = "big" if big_endian else "little"
+    ident = b"\x7fELF" + bytes([2, 2 if big_endian else 1, 1]) + bytes(9)
+    return ident + (2).to_bytes(2, byteorder) + machine.to_bytes(2, byteorder) + bytes(44)
+
+
+@pytest.mark.parametrize("header, arch", [
+    (_elf_header(0x3E), "x64"),
+    (_elf_header(0xB7), "arm64"),
+    (_elf_header(0x28), "arm"),
+    (_elf_header(0xB7, big_endian=True), "arm64"),
+    (b"\xcf\xfa\xed\xfe" + (0x0100000C).to_bytes(4, "little") + bytes(24), "arm64"),
+    (b"\xcf\xfa\xed\xfe" + (0x01000007).to_bytes(4, "little") + bytes(24), "x64"),
+    (_elf_header(0x9999), None),
+    (b"#!/bin/sh\nexec node \"$@\"\n", None),
+    (b"\x7fELF", None),
+])
+def test_read_binary_arch(tmp_path, header, arch):
+    binary = tmp_path / "node"
+    binary.write_bytes(header)
+    assert grade._read_binary_arch(str(binary)) == arch
+
+
+def test_read_binary_arch_missing_file(tmp_path):
+    assert grade._read_binary_arch(str(tmp_path / "missing")) is None
+
+
+def test_node_arch_fallback_is_not_cached(tmp_path, monkeypatch):
+    grade._node_arch_for_binary.cache_clear()
+    node = tmp_path / "node"
+    monkeypatch.setattr(grade.shutil, "which", lambda name: None)
+    monkeypatch.setattr(grade, "_query_node_arch", lambda command: None)
+    assert grade._detect_node_arch() == "arm64"
+
+    # A shim that can't be queried falls back without caching the result
+    node.write_text("#!/bin/sh\n")
+    monkeypatch.setattr(grade.shutil, "which", lambda name: str(node))
+    assert grade._detect_node_arch() == "arm64"
+    assert grade._node_arch_for_binary.cache_info().currsize == 0
+
+    # Once a real binary is there, its architecture is detected and cached
+    node.write_bytes(_elf_header(0x3E))
+    assert grade._detect_node_arch() == "x64"
+    assert grade._node_arch_for_binary.cache_info().currsize == 1
+    grade._node_arch_for_binary.cache_clear()
+
+
+def _write_modules_yaml(workspace, store_dir):
+    node_modules = workspace / "node_modules"
+    node_modules.mkdir(exist_ok=True)
+    (node_modules / ".modules.yaml").write_text(
+        f"hoistPattern:\n  - '*'\nlayoutVersion: 5\nstoreDir: {store_dir}\nvirtualStoreDir: .pnpm\n"
+    )
+
+
+def test_node_modules_uses_store(workspace):
+    grader = Grader(str(workspace))
+    assert grader._node_modules_uses_store() is False
+
+    _write_modules_yaml(workspace, "/root/.local/share/pnpm/store/v10")
+    assert grader._node_modules_uses_store() is False
+
+    _write_modules_yaml(workspace, f"{grade.PNPM_STORE_DIR}/v10")
+    assert grader._node_modules_uses_store() is True
+
+
+def test_frozen_install_relinks_node_modules_from_another_store(workspace, trash_dir, monkeypatch):
+    (workspace / "package.json").write_text('{"name": "app"}')
+    (workspace / "pnpm-lock.yaml").write_text("lockfileVersion: '9.0'\n")
+    _write_modules_yaml(workspace, "/root/.local/share/pnpm/store/v10")
+    grader = Grader(str(workspace))
+
+    commands = []
+
+    def fake_execute(argv, env=None, timeout=600, echo=False):
+        commands.append((argv, (workspace / "node_modules").exists()))
+        return True, "", "", 0
+
+    monkeypatch.setattr(grade, "_detect_node_arch", lambda: "x64")
+    monkeypatch.setattr(grader, "_execute", fake_execute)
+    monkeypatch.setattr(grader, "_needs_native_rebuild", lambda: False)
+
+    assert grader.run_install() is True
+    grader._wait_for_discards()
+
+    assert commands == [(["pnpm", "install", "--frozen-lockfile", "--prefer-offline"], False)]
+    assert (workspace / "pnpm-lock.yaml").exists()
+
+
+def _install_package(node_modules, name, package_json=None, files=()):
+    """Create a package the way pnpm lays it out under node_modules/.pnpm."""
+    package_dir = node_modules / ".pnpm" / f"{name.replace('/', '+')}@1.0.0" / "node_modules" / name
+    package_dir.mkdir(parents=True)
+    if package_json is not None:
+        (package_dir / "package.json").write_text(package_json)
+    for file_name in files:
+        (package_dir / file_name).write_bytes(b"\0")
+    return package_dir
+
+
+def test_installed_package_dirs_skips_dependency_symlinks(workspace):
+    node_modules = workspace / "node_modules"
+    swc = _install_package(node_modules, "@next/swc-linux-x64-gnu")
+    next_dir = _install_package(node_modules, "next")
+    (next_dir.parent / "@next").mkdir()
+    (next_dir.parent / "@next" / "swc-linux-x64-gnu").symlink_to(swc)
+
+    assert sorted(grade._installed_package_dirs(node_modules)) == sorted([str(swc), str(next_dir)])
+
+
+@pytest.mark.parametrize("package_json, files, needs_build", [
+    ('{"name": "@next/swc-linux-x64-gnu"}', ["next-swc.linux-x64-gnu.node"], False),
+    ('{"name": "lightningcss", "scripts": {"test": "jest"}}', ["lightningcss.node"], False),
+    ('{"name": "esbuild", "scripts": {"postinstall": "node install.js"}}', [], True),
+    ('{"name": "bcrypt", "scripts": {"install": "node-pre-gyp install"}}', [], True),
+    ('{"name": "addon"}', ["binding.gyp"], True),
+    ('{"name": "broken"', [], False),
+    (None, [], False),
+])
+def test_package_needs_build(workspace, package_json, files, needs_build):
+    package_dir = _install_package(workspace / "node_modules", "pkg", package_json, files)
+    assert grade._package_needs_build(str(package_dir)) is needs_build
+
+
+def test_prebuilt_binaries_skip_native_rebuild(workspace):
+    (workspace / "package.json").write_text('{"name": "app", "scripts": {"build": "next build"}}')
+    (workspace / "pnpm-lock.yaml").write_text("lockfileVersion: '9.0'\n")
+    node_modules = workspace / "node_modules"
+    _install_package(node_modules, "@next/swc-linux-x64-gnu", "{}", ["next-swc.linux-x64-gnu.node"])
+    _install_package(node_modules, "next", '{"scripts": {"build": "taskr"}}')
+    assert Grader(str(workspace))._needs_native_rebuild() is False
+
+    # The verdict is cached per lockfile; a new lockfile rescans
+    _install_package(node_modules, "sharp", '{"scripts": {"install": "node install/check"}}')
+    (workspace / "pnpm-lock.yaml").write_text("lockfileVersion: '9.0'\n# sharp\n")
+    assert Grader(str(workspace))._needs_native_rebuild() is True
@@ -0,0 +1,369 @@
+"""
+Tests for grader.rubric_judge that run without network access.
+
+LiteLLM is replaced by a stand-in module, so no judge calls are made.
+"""
+
+import asyncio
+import json
+import types
+
+import pytest
+
+from grader import rubric_judge
+from grader.rubric_judge import RubricJudge
+
+
+@pytest.fixture
+def fake_litellm(monkeypatch):
+    """Stand-in for the lazily imported litellm module."""
+    fake = types.SimpleNamespace(get_supported_openai_params=lambda model: [])
+    monkeypatch.setattr(rubric_judge, "_litellm", fake)
+    return fake
+
+
+@pytest.fixture
+def make_judge(fake_litellm, tmp_path):
+    def make(**kwargs):
+        kwargs.setdefault("cache_dir", tmp_path / "cache")
+        return RubricJudge(**kwargs)
+    return make
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    path = tmp_path / "ws"
+    (path / "app").mkdir(parents=True)
+    (path / "app" / "page.tsx").write_text(
+        "export default function Page() {\n"
+        + "  return <main>Hello</main>\n" * 20
+        + "}\n"
+    )
+    return path
+
+
+def _completion_response(content: str):
+    message = types.SimpleNamespace(content=content)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=None)
+
+
+def _install_completion(fake_litellm, verdict: dict) -> list:
+    """Make every completion return `verdict`; returns the list of calls made."""
+    calls = []
+
+    async def acompletion(**kwargs):
+        calls.append(kwargs)
+        return _completion_response(json.dumps(verdict))
+
+    fake_litellm.acompletion = acompletion
+    return calls
+
+
+def test_null_evidence_is_coerced_and_cached(make_judge, fake_litellm, workspace):
+    calls = _install_completion(fake_litellm, {"status": "PASS", "evidence": None})
+    judge = make_judge(combine_items=False)
+    rubric = "1. Renders a page\n2. Says hello"
+
+    result = judge.evaluate(str(workspace), "prompt", rubric, system_log="log")
+    assert result["score"] == 1.0
+    assert [item["evidence"] for item in result["breakdown"]] == ["", ""]
+    assert len(calls) == 2
+
+    cached = judge.evaluate(str(workspace), "prompt", rubric, system_log="log")
+    assert cached["metadata"]["cached"] is True
+    assert len(calls) == 2
+
+
+def _cache_key(judge: RubricJudge) -> str:
+    judge._setup_llm()
+    return judge._cache_key("prompt", "rubric", "code", "log")
+
+
+def test_cache_keys_do_not_depend_on_orjson(make_judge, monkeypatch):
+    key = _cache_key(make_judge())
+    judge = make_judge()
+    judge._setup_llm()
+    item_hash = judge._item_context_hash("code", "log")
+
+    monkeypatch.setattr(rubric_judge, "_json_dumps", lambda obj: b"different serializer")
+    judge = make_judge()
+    assert _cache_key(judge) == key
+    assert judge._item_context_hash("code", "log") == item_hash
+
+
+def test_cache_keys_change_with_judge_settings(make_judge):
+    key = _cache_key(make_judge())
+    assert _cache_key(make_judge(combine_items=False)) != key
+    assert _cache_key(make_judge(model="openai/gpt-4o")) != key
+    assert _cache_key(make_judge()) == key
+
+
+def test_context_preparation_does_not_load_litellm(workspace, monkeypatch):
+    def failing_load():
+        raise ImportError("No module named 'litellm'")
+
+    monkeypatch.setattr(rubric_judge, "_load_litellm", failing_load)
+
+    source_files, code_context, omitted_files = rubric_judge.prepare_code_context(str(workspace))
+    assert [path.name for path in source_files] == ["page.tsx"]
+    assert "=== app/page.tsx ===" in code_context
+    assert omitted_files == 0
+
+    judge = RubricJudge(cache_dir=None)
+    with pytest.raises(ImportError):
+        judge.evaluate(str(workspace), "prompt", "1. Renders", system_log="log")
+
+
+def test_packed_items_honor_step_delay(make_judge, monkeypatch):
+    judge = make_judge(step_delay=2.0)
+    calls = []
+
+    async def fake_all_items(pack, code_context, system_log):
+        calls.append(("call", tuple(pack)))
+        return [{"item": item, "status": "PASS", "evidence": ""} for item in pack]
+
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds):
+        calls.append(("sleep", seconds))
+        await real_sleep(0)
+
+    monkeypatch.setattr(judge, "_aevaluate_all_items", fake_all_items)
+    monkeypatch.setattr(rubric_judge.asyncio, "sleep", fake_sleep)
+
+    packs = [["1. A", "2. B"], ["3. C"], ["4. D"]]
+    results = asyncio.run(judge._aevaluate_packed_items(packs, "code", "log"))
+
+    assert [r["item"] for r in results] == ["1. A", "2. B", "3. C", "4. D"]
+    assert calls == [
+        ("call", ("1. A", "2. B")), ("sleep", 2.0),
+        ("call", ("3. C",)), ("sleep", 2.0),
+        ("call", ("4. D",)),
+    ]
+
+
+PREFAILED_ITEMS = [
+    "2. Uses Stripe for payments",
+    "3. Built with Prisma as the ORM",
+    "5. Users can add or remove tasks; uses Zod to validate the form",
+]
+JUDGED_ITEMS = [
+    "1. Uses Supabase for auth (or a mock of it)",
+    "4. Does not use WebSockets; polling is fine",
+    "6. Persists data, e.g. using Prisma",
+    "7. Persists the board to localStorage",
+    "8. Uses Postgres or SQLite for storage",
+    "9. Renders a list of tasks",
+]
+
+
+def test_prefail_missing_technologies(make_judge):
+    judge = make_judge(prefail_technologies=True)
+    rubric_items = PREFAILED_ITEMS + JUDGED_ITEMS
+
+    prefailed = judge._prefail_missing_technologies(rubric_items, "const x = 1", 0)
+
+    assert sorted(rubric_items[index] for index in prefailed) == sorted(PREFAILED_ITEMS)
+    assert all(result["status"] == "FAIL" for result in prefailed.values())
+
+
+def test_prefail_skips_technologies_the_code_references(make_judge):
+    judge = make_judge(prefail_technologies=True)
+    code = "import Stripe from 'stripe'\nimport { PrismaClient } from '@prisma/client'"
+
+    prefailed = judge._prefail_missing_technologies(PREFAILED_ITEMS[:2], code, 0)
+    assert prefailed == {}
+
+
+def test_prefail_is_disabled_for_truncated_context(make_judge):
+    judge = make_judge(prefail_technologies=True)
+    assert judge._prefail_missing_technologies(PREFAILED_ITEMS, "const x = 1", 3) == {}
+
+
+def test_assemble_code_context_reports_omitted_files(make_judge, workspace):
+    (workspace / "app" / "extra.ts").write_text("export const value = 1\n" * 200)
+    judge = make_judge()
+    source_files = judge._discover_source_files(workspace)
+
+    _, omitted_files = judge._assemble_code_context(workspace, source_files, max_tokens=None)
+    assert omitted_files == 0
+
+    _, omitted_files = judge._assemble_code_context(workspace, source_files, max_tokens=300)
+    assert omitted_files == 1
+
+
+def test_item_messages_do_not_share_mutable_parts(make_judge):
+    judge = make_judge(model="anthropic/claude-3-5-sonnet-20241022")
+    code_context, system_log = "const x = 1", "log"
+
+    first = judge._build_item_messages("1. A", code_context, system_log)
+    first[0]["content"][0]["cache_control"]["type"] = "mutated"
+    first[0]["content"].append({"type": "text", "text": "extra"})
+
+    second = judge._build_item_messages("2. B", code_context, system_log)
+    assert second[0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert len(second[0]["content"]) == 1
+    assert second[0]["content"][0]["text"] is first[0]["content"][0]["text"]
+
+
+def test_evaluate_releases_cached_system_message(make_judge, fake_litellm, workspace):
+    _install_completion(fake_litellm, {"status": "PASS", "evidence": "app/page.tsx:1"})
+    judge = make_judge(combine_items=False, cache_dir=None)
+
+    judge.evaluate(str(workspace), "prompt", "1. Renders a page", system_log="log")
+    assert judge._item_system_message is None
+
+
+def test_per_item_cache_skips_failed_calls(make_judge, fake_litellm, workspace):
+    calls = []
+
+    async def acompletion(**kwargs):
+        calls.append(kwargs)
+        if "2. Broken" in kwargs["messages"][-1]["content"]:
+            raise RuntimeError("provider unavailable")
+        # An "error" key in a real verdict must not be mistaken for a failed call
+        verdict = {"status": "PASS", "evidence": None, "error": True}
+        return _completion_response(json.dumps(verdict))
+
+    fake_litellm.acompletion = acompletion
+    judge = make_judge(combine_items=False)
+    rubric = "1. Renders a page\n2. Broken"
+
+    result = judge.evaluate(str(workspace), "prompt", rubric, system_log="log")
+    assert [item["status"] for item in result["breakdown"]] == ["PASS", "FAIL"]
+    assert "error" not in result["breakdown"][0]
+    assert result["breakdown"][1]["error"] is True
+    assert len(calls) == 2
+
+    # The whole result isn't cached; only the successful item's verdict is reused
+    result = judge.evaluate(str(workspace), "prompt", rubric, system_log="log")
+    assert "cached" not in result["metadata"]
+    assert len(calls) == 3
+
+
+class _FakeClock:
+    """Monotonic clock whose sleeps advance time instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _FakeClock()
+    monkeypatch.setattr(rubric_judge, "time", types.SimpleNamespace(monotonic=fake.monotonic))
+    monkeypatch.setattr(rubric_judge, "asyncio", types.SimpleNamespace(sleep=fake.sleep))
+    return fake
+
+
+def _usage_response(total_tokens):
+    return types.SimpleNamespace(usage=types.SimpleNamespace(total_tokens=total_tokens))
+
+
+def test_rate_limiter_without_limits_never_waits(clock):
+    limiter = rubric_judge._RateLimiter(None, None)
+    for _ in range(100):
+        assert asyncio.run(limiter.acquire(50_000)) == 50_000
+    assert clock.sleeps == []
+
+
+def test_rate_limiter_waits_for_request_budget(clock):
+    limiter = rubric_judge._RateLimiter(requests_per_minute=2, tokens_per_minute=None)
+
+    asyncio.run(limiter.acquire(10))
+    asyncio.run(limiter.acquire(10))
+    assert clock.sleeps == []
+
+    asyncio.run(limiter.acquire(10))
+    assert clock.sleeps == [pytest.approx(30.0)]
+
+
+def test_rate_limiter_waits_for_token_budget_and_caps_oversized_requests(clock):
+    limiter = rubric_judge._RateLimiter(requests_per_minute=None, tokens_per_minute=1000)
+
+    assert asyncio.run(limiter.acquire(600)) == 600
+    assert asyncio.run(limiter.acquire(5000)) == 1000
+    # 400 tokens left, 1000 needed: wait for 600 tokens at 1000 per minute
+    assert clock.sleeps == [pytest.approx(36.0)]
+
+
+def test_rate_limiter_settle_refunds_unused_tokens(clock):
+    limiter = rubric_judge._RateLimiter(requests_per_minute=None, tokens_per_minute=1000)
+
+    debited = asyncio.run(limiter.acquire(800))
+    limiter.settle(debited, _usage_response(100))
+    asyncio.run(limiter.acquire(900))
+    assert clock.sleeps == []
+
+    # Responses without usage leave the estimate in place
+    limiter.settle(900, types.SimpleNamespace())
+    asyncio.run(limiter.acquire(1000))
+    assert clock.sleeps == [pytest.approx(60.0)]
+
+
+def _install_batch_api(fake_litellm, output_lines, status="completed"):
+    """Make the batch API finish immediately with the given output file lines."""
+    submitted = {}
+
+    async def acreate_file(file, purpose, custom_llm_provider):
+        submitted["requests"] = [json.loads(line) for line in file[1].splitlines()]
+        return types.SimpleNamespace(id="file-in")
+
+    async def acreate_batch(**kwargs):
+        return types.SimpleNamespace(id="batch-1", status=status, output_file_id="file-out")
+
+    async def afile_content(file_id, custom_llm_provider):
+        return types.SimpleNamespace(text="\n".join(output_lines))
+
+    fake_litellm.get_llm_provider = lambda model: (model.split("/", 1)[1], "openai", None, None)
+    fake_litellm.acreate_file = acreate_file
+    fake_litellm.acreate_batch = acreate_batch
+    fake_litellm.afile_content = afile_content
+    return submitted
+
+
+def _batch_output_line(custom_id, content):
+    body = {"choices": [{"message": {"content": content}}]}
+    return json.dumps({"custom_id": custom_id, "response": {"status_code": 200, "body": body}})
+
+
+def test_batch_api_output_parsing(make_judge, fake_litellm):
+    direct_calls = _install_completion(fake_litellm, {"status": "PASS", "evidence": "direct"})
+    submitted = _install_batch_api(fake_litellm, [
+        _batch_output_line("item-1", json.dumps({"status": "PASS", "evidence": "batch"})),
+        "{not json",
+        json.dumps({"custom_id": "item-0", "response": None}),
+        _batch_output_line("item-2", "no verdict here"),
+        "",
+    ])
+    judge = make_judge(model="openai/gpt-4o-mini", use_batch_api=True)
+    judge._setup_llm()
+    items = ["1. A", "2. B", "3. C"]
+
+    results = asyncio.run(judge._aevaluate_with_batch_api(items, "code", "log"))
+
+    assert [request["custom_id"] for request in submitted["requests"]] == [
+        "item-0", "item-1", "item-2"
+    ]
+    # item-0 has no usable output line, so it is judged with a direct call
+    assert results[0] == {"item": "1. A", "status": "PASS", "evidence": "direct"}
+    assert len(direct_calls) == 1
+    assert results[1] == {"item": "2. B", "status": "PASS", "evidence": "batch"}
+    assert results[2]["status"] == "FAIL"
+    assert results[2]["error"] is True
+
+
+def test_batch_api_failed_job_falls_back(make_judge, fake_litellm):
+    _install_batch_api(fake_litellm, [], status="failed")
+    judge = make_judge(model="openai/gpt-4o-mini", use_batch_api=True)
+    judge._setup_llm()
+
+    assert asyncio.run(judge._aevaluate_with_batch_api(["1. A"], "code", "log")) is None
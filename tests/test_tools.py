@@ -0,0 +1,40 @@
+"""
+Tests for env.tools helpers.
+"""
+
+import os
+import types
+
+from env import tools
+from env.sandbox import Sandbox
+
+
+def test_read_text_matches_path_read_text(tmp_path):
+    for size in (0, 100, (1 << 14) - 1, 1 << 14, 1 << 20, (1 << 20) + 5):
+        path = tmp_path / f"file{size}.txt"
+        path.write_bytes(b"a\r\nb\r" + b"x" * size + "é".encode("utf-8"))
+        assert tools._read_text(path) == path.read_text(encoding="utf-8")
+
+
+def test_read_text_reads_past_stale_size(tmp_path, monkeypatch):
+    """A file that grew after fstat is still read to the end."""
+    path = tmp_path / "server.log"
+    path.write_text("line\n" * 20_000)
+
+    real_fstat = os.fstat
+    monkeypatch.setattr(
+        tools.os, "fstat",
+        lambda fd: types.SimpleNamespace(st_size=10, st_mode=real_fstat(fd).st_mode)
+    )
+
+    assert tools._read_text(path) == path.read_text()
+
+
+def test_list_files_reports_workspace_root_as_dot(tmp_path):
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "page.tsx").write_text("export default 1\n")
+    result = tools.Tools(Sandbox(tmp_path)).list_files(".", "**")
+
+    assert result.success
+    paths = [entry["path"] for entry in result.data["files"]]
+    assert paths == [".", "app"]